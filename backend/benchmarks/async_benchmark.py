@@ -0,0 +1,69 @@
+"""Compare concurrent-request throughput of the sync and async database modes.
+
+Boots the app twice under uvicorn (DB_ASYNC=false and DB_ASYNC=true) against
+the same database and drives catalog reads at increasing concurrency. Uses a
+local SQLite file by default; pass --database-url to benchmark a real MySQL
+server, where network round trips make the threadpool limit visible.
+
+Usage:
+    python -m backend.benchmarks.async_benchmark --concurrency 16 64 256
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import httpx
+from backend.benchmarks.common import database_session_factory, seed_products, running_server, drive_load
+
+
+async def _run_mode(base_url: str, products: int, concurrency_levels, requests_per_level: int) -> list:
+    async def request(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        if n % 2:
+            return await client.get(f"/api/products/{n % products + 1}")
+        return await client.get("/api/products/", params={"limit": 20, "skip": n % 50})
+
+    limits = httpx.Limits(max_connections=max(concurrency_levels), max_keepalive_connections=max(concurrency_levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await drive_load(client, request, 8, 200)  # warm up
+        return [await drive_load(client, request, level, requests_per_level) for level in concurrency_levels]
+
+
+def run(database_url: str, products: int, concurrency_levels, requests_per_level: int, seed: bool) -> dict:
+    """Run the benchmark for both modes and return results as a dictionary."""
+    if seed:
+        db = database_session_factory(database_url)()
+        seed_products(db, products)
+        db.close()
+
+    results = {"database": database_url.split("://")[0], "products": products, "modes": {}}
+    for mode in ("sync", "async"):
+        env = {"DB_ASYNC": "true" if mode == "async" else "false"}
+        with running_server(database_url, env) as base_url:
+            results["modes"][mode] = asyncio.run(
+                _run_mode(base_url, products, concurrency_levels, requests_per_level)
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Database to benchmark (default: temporary SQLite file)")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--no-seed", action="store_true", help="Use the existing products in --database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'async_benchmark.db'}"
+    results = run(database_url, args.products, args.concurrency, args.requests, seed=not args.no_seed)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Shared helpers for the benchmark scripts."""
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker, Session
+from backend.database import Base
+from backend.models.product import Product
+from backend.models.user import User
+from backend.models.cart import Cart
+from backend.models.order import Order, OrderItem
+from backend.models.reservation import StockReservation
+
+CATEGORIES = ["Electronics", "Sports", "Home", "Books", "Toys", "Garden", "Fashion", "Beauty"]
+
+ADJECTIVES = [
+    "wireless", "portable", "ergonomic", "stainless", "organic", "compact", "premium",
+    "vintage", "waterproof", "rechargeable", "lightweight", "durable", "smart", "classic",
+]
+
+NOUNS = [
+    "laptop", "mouse", "keyboard", "headphones", "shoes", "mat", "bottle", "blender",
+    "lamp", "backpack", "jacket", "watch", "speaker", "camera", "novel", "chair",
+    "kettle", "tent", "puzzle", "serum", "drill", "sunglasses", "monitor", "charger",
+]
+
+FILLER = [
+    "with", "for", "and", "everyday", "use", "designed", "comfortable", "high", "quality",
+    "fast", "easy", "setup", "long", "lasting", "battery", "soft", "grip", "travel", "home",
+]
+
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+
+def database_session_factory(url: str) -> sessionmaker:
+    """Create all tables in the given database and return a session factory."""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def sqlite_session_factory(path: Optional[str] = None) -> sessionmaker:
+    """Create all tables in a SQLite database and return a session factory."""
+    return database_session_factory(f"sqlite:///{path}" if path else "sqlite://")
+
+
+def generate_products(count: int, seed: int = 42) -> List[dict]:
+    """Generate synthetic product rows."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        words = rng.sample(FILLER, 6) + [rng.choice(NOUNS), rng.choice(ADJECTIVES)]
+        rows.append({
+            "name": f"{adjective.title()} {noun.title()} {rng.randint(100, 999)}",
+            "description": " ".join(words).capitalize(),
+            "price": round(rng.uniform(5, 500), 2),
+            "category": rng.choice(CATEGORIES),
+            "stock_quantity": rng.randint(0, 200),
+            "image_url": None,
+        })
+    return rows
+
+
+def seed_products(db: Session, count: int, batch_size: int = 5000) -> None:
+    """Bulk insert synthetic products."""
+    rows = generate_products(count)
+    for start in range(0, count, batch_size):
+        db.execute(insert(Product), rows[start:start + batch_size])
+    db.commit()
+
+
+def seed_users(db: Session, count: int, password: str, rounds: int, prefix: str = "bench") -> None:
+    """Create users named {prefix}0..{prefix}N-1 sharing one password hash."""
+    hashed = CryptContext(schemes=["bcrypt"]).hash(password, rounds=rounds)
+    db.execute(insert(User), [
+        {"username": f"{prefix}{n}", "email": f"{prefix}{n}@example.com", "hashed_password": hashed}
+        for n in range(count)
+    ])
+    db.commit()
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> dict:
+    """Call fn repeatedly and summarize wall-clock latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples_ms: List[float]) -> dict:
+    """Summarize latency samples in milliseconds."""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(database_url: str, env: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Iterator[str]:
+    """
+    Run backend.main:app under uvicorn in a subprocess and yield its base URL.
+    Settings are read at import time, so each configuration needs its own process.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "ENVIRONMENT": "benchmark", **(env or {}), "DATABASE_URL": database_url},
+        stdout=sys.stderr,  # keep stdout clean for the JSON report
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("Server did not become healthy in time")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def drive_load(
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    concurrency: int,
+    total_requests: int
+) -> dict:
+    """
+    Issue total_requests calls of request(client, n) from `concurrency` workers.
+    Returns throughput, latency percentiles and error counts.
+    """
+    counter = iter(range(total_requests))
+    samples: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            start = time.perf_counter()
+            try:
+                response = await request(client, n)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "error_rate": round(errors / total_requests, 4) if total_requests else 0.0,
+        "throughput_rps": round(total_requests / elapsed, 1),
+        "latency": summarize(samples),
+    }
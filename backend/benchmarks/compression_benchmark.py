@@ -0,0 +1,154 @@
+"""Measure the CPU-versus-bandwidth trade-off of response compression.
+
+Seeds a throwaway SQLite database and fetches our typical large payloads
+through the app: a 100-product listing, a user's order history (orders with
+nested items and full products) and a full cart. For each payload and codec
+setting it reports:
+
+    bytes / ratio      compressed size and original/compressed ratio
+    compress_ms        server CPU time to compress (mean)
+    decompress_ms      client CPU time to decompress (mean)
+    break_even_mbps    link speed below which compression wins: the bytes it
+                       saves take longer to send than compressing them costs
+    transfer_ms        compress + transfer (+ decompress) time on each link
+    end_to_end_ms      full request through the app wrapped in the middleware
+
+Usage:
+    python -m backend.benchmarks.compression_benchmark --rows 100
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+# Each codec setting wraps the app in its own CompressionMiddleware below
+os.environ["COMPRESSION_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+from backend.benchmarks.common import sqlite_session_factory, summarize, time_calls
+from backend.benchmarks.serialization_benchmark import seed
+from backend.database import get_db, get_read_db
+from backend.main import app
+from backend.utils.auth import create_access_token
+from backend.utils.compression import CompressionMiddleware, brotli
+
+LINKS_MBPS = (10, 100, 1000)
+
+
+def codec_settings() -> dict:
+    """Codec settings to compare: name -> (Accept-Encoding, middleware options)."""
+    settings = {
+        "gzip-1": ("gzip", {"gzip_level": 1}),
+        "gzip-6": ("gzip", {"gzip_level": 6}),
+        "gzip-9": ("gzip", {"gzip_level": 9}),
+    }
+    if brotli is not None:
+        settings.update({
+            "br-1": ("br", {"brotli_quality": 1}),
+            "br-4": ("br", {"brotli_quality": 4}),
+            "br-6": ("br", {"brotli_quality": 6}),
+            "br-11": ("br", {"brotli_quality": 11}),
+        })
+    return settings
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    return brotli.decompress(body) if encoding == "br" else gzip.decompress(body)
+
+
+def _transfer_ms(size: int, mbps: float) -> float:
+    return size * 8 / (mbps * 1_000_000) * 1000
+
+
+def run(rows: int, repeat: int) -> dict:
+    """Run the benchmark and return results as a dictionary."""
+    SessionLocal = sqlite_session_factory(str(Path(tempfile.mkdtemp()) / "compression.db"))
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    client = TestClient(app)  # not entered: skip startup against the configured database
+    db = SessionLocal()
+    user_id = seed(db, rows)
+    db.close()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+    payloads = {
+        "GET /api/products/": "/api/products/?limit=%d" % min(rows, 100),
+        "GET /api/orders/": "/api/orders/?limit=%d" % min(rows, 100),
+        "GET /api/cart/": "/api/cart/",
+    }
+    codecs = codec_settings()
+    results = {"rows": rows, "brotli_available": brotli is not None, "payloads": {}}
+
+    for name, url in payloads.items():
+        body = client.get(url, headers={**headers, "Accept-Encoding": "identity"}).content
+        identity_e2e = time_calls(lambda: client.get(url, headers={**headers, "Accept-Encoding": "identity"}), repeat)
+        payload = {
+            "bytes": len(body),
+            "identity": {
+                "end_to_end_ms": identity_e2e["mean_ms"],
+                "transfer_ms": {f"{mbps}mbps": round(_transfer_ms(len(body), mbps), 3) for mbps in LINKS_MBPS},
+            },
+            "codecs": {},
+        }
+
+        for codec, (encoding, options) in codecs.items():
+            middleware = CompressionMiddleware(None, **options)
+            compressed = middleware.compress(body, encoding)
+            assert _decompress(compressed, encoding) == body
+            compress_ms = time_calls(lambda: middleware.compress(body, encoding), repeat)["mean_ms"]
+            decompress_ms = time_calls(lambda: _decompress(compressed, encoding), repeat)["mean_ms"]
+            saved_bits = (len(body) - len(compressed)) * 8
+
+            # End to end through the app wrapped in this setting's middleware
+            compressing_client = TestClient(CompressionMiddleware(app, **options))
+            accept = {**headers, "Accept-Encoding": encoding}
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = compressing_client.get(url, headers=accept)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            payload["codecs"][codec] = {
+                "bytes": len(compressed),
+                "ratio": round(len(body) / len(compressed), 2),
+                "compress_ms": compress_ms,
+                "decompress_ms": decompress_ms,
+                "break_even_mbps": round(saved_bits / (compress_ms / 1000) / 1_000_000, 1) if compress_ms else None,
+                "transfer_ms": {
+                    f"{mbps}mbps": round(compress_ms + _transfer_ms(len(compressed), mbps) + decompress_ms, 3)
+                    for mbps in LINKS_MBPS
+                },
+                "end_to_end_ms": summarize(samples)["mean_ms"],
+                "served_encoding": response.headers.get("content-encoding"),
+            }
+        results["payloads"][name] = payload
+
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Products, orders and cart lines per payload")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Scenario-based load test of the public API against a local database.
+
+Boots backend.main:app under uvicorn (a temporary SQLite file by default, so
+no MySQL server is needed), seeds products and users, and runs virtual users
+at each concurrency level. Every virtual user logs in once, then repeatedly
+picks a weighted scenario:
+
+    browse    list products, follow the next-page cursor, filter by category, open a product
+    search    search products
+    login     log in again
+    cart      add a product to the cart, view the cart, remove the item
+    checkout  add one to three products to the cart and check out
+
+Results are printed as JSON (throughput, p50/p95/p99 latency and error rate
+per level, scenario and endpoint) together with the current git commit, so
+runs can be saved and compared across commits:
+
+    python -m backend.benchmarks.load_test --output before.json
+    python -m backend.benchmarks.load_test --output after.json --compare before.json
+
+Usage:
+    python -m backend.benchmarks.load_test --concurrency 8 32 --duration 20
+    python -m backend.benchmarks.load_test --mix browse=80,search=20 --env CATALOG_REPLICA_ENABLED=true
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import httpx
+from sqlalchemy import update
+from backend.benchmarks.common import (
+    ADJECTIVES, CATEGORIES, NOUNS, REPO_ROOT, database_session_factory, running_server, seed_products,
+    seed_users, summarize
+)
+from backend.models.product import Product
+
+PASSWORD = "load-test-password"
+DEFAULT_MIX = "browse=50,search=20,cart=15,checkout=10,login=5"
+
+
+class Recorder:
+    """Collects latency samples and errors per scenario and per endpoint."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, List[float]] = {}
+        self.endpoint_errors: Dict[str, int] = {}
+        self.scenarios: Dict[str, List[float]] = {}
+        self.scenario_errors: Dict[str, int] = {}
+        self.requests = 0
+
+    def record_request(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        self.requests += 1
+        self.endpoints.setdefault(name, []).append(elapsed_ms)
+        if not ok:
+            self.endpoint_errors[name] = self.endpoint_errors.get(name, 0) + 1
+
+    def record_scenario(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        self.scenarios.setdefault(name, []).append(elapsed_ms)
+        if not ok:
+            self.scenario_errors[name] = self.scenario_errors.get(name, 0) + 1
+
+    @staticmethod
+    def _report(samples: Dict[str, List[float]], errors: Dict[str, int]) -> dict:
+        return {
+            name: {
+                "errors": errors.get(name, 0),
+                "error_rate": round(errors.get(name, 0) / len(values), 4),
+                "latency": summarize(values),
+            }
+            for name, values in sorted(samples.items())
+        }
+
+    def report(self, concurrency: int, elapsed: float) -> dict:
+        errors = sum(self.endpoint_errors.values())
+        all_samples = [sample for values in self.endpoints.values() for sample in values]
+        return {
+            "concurrency": concurrency,
+            "duration_seconds": round(elapsed, 2),
+            "requests": self.requests,
+            "scenarios_completed": sum(len(values) for values in self.scenarios.values()),
+            "throughput_rps": round(self.requests / elapsed, 1) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / self.requests, 4) if self.requests else 0.0,
+            "latency": summarize(all_samples),
+            "scenarios": self._report(self.scenarios, self.scenario_errors),
+            "endpoints": self._report(self.endpoints, self.endpoint_errors),
+        }
+
+
+class ScenarioFailed(Exception):
+    """A request inside a scenario failed; the rest of the scenario is skipped."""
+
+
+class VirtualUser:
+    """One simulated shopper with its own token and random stream."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, username: str, products: int, seed: int):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.products = products
+        self.rng = random.Random(seed)
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request and record it under the endpoint name."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record_request(name, (time.perf_counter() - start) * 1000, ok)
+        if not ok:
+            raise ScenarioFailed(name)
+        return response
+
+    def random_product(self) -> int:
+        return self.rng.randint(1, self.products)
+
+    async def login(self) -> None:
+        response = await self.request(
+            "POST /api/users/login", "POST", "/api/users/login",
+            json={"username": self.username, "password": PASSWORD}
+        )
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse(self) -> None:
+        page = await self.request("GET /api/products/", "GET", "/api/products/", params={"limit": 20})
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor:
+            await self.request("GET /api/products/", "GET", "/api/products/", params={"limit": 20, "cursor": cursor})
+        await self.request(
+            "GET /api/products/?category", "GET", "/api/products/",
+            params={"limit": 20, "category": self.rng.choice(CATEGORIES)}
+        )
+        await self.request("GET /api/products/{id}", "GET", f"/api/products/{self.random_product()}")
+
+    async def search(self) -> None:
+        term = self.rng.choice(NOUNS) if self.rng.random() < 0.7 else f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)}"
+        await self.request("GET /api/products/?search", "GET", "/api/products/", params={"search": term, "limit": 20})
+
+    async def cart(self) -> None:
+        item = await self.request(
+            "POST /api/cart/add", "POST", "/api/cart/add",
+            json={"product_id": self.random_product(), "quantity": 1}
+        )
+        await self.request("GET /api/cart/", "GET", "/api/cart/")
+        await self.request("DELETE /api/cart/remove/{id}", "DELETE", f"/api/cart/remove/{item.json()['id']}")
+
+    async def checkout(self) -> None:
+        for _ in range(self.rng.randint(1, 3)):
+            await self.request(
+                "POST /api/cart/add", "POST", "/api/cart/add",
+                json={"product_id": self.random_product(), "quantity": self.rng.randint(1, 2)}
+            )
+        await self.request(
+            "POST /api/orders/checkout", "POST", "/api/orders/checkout",
+            json={"shipping_address": "1 Load Test Street, Benchmark City"}
+        )
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "browse": VirtualUser.browse,
+    "search": VirtualUser.search,
+    "login": VirtualUser.login,
+    "cart": VirtualUser.cart,
+    "checkout": VirtualUser.checkout,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'browse=50,search=20' into scenario weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, mix: Dict[str, float], products: int, seed: int) -> dict:
+    """Run `concurrency` virtual users for `duration` seconds."""
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Logins before the clock starts are not part of the measured mix
+        users = [
+            VirtualUser(client, Recorder(), f"load{n}", products, seed=seed * 1000 + n)
+            for n in range(concurrency)
+        ]
+        await asyncio.gather(*(user.login() for user in users))
+        for user in users:
+            user.recorder = recorder
+        deadline = time.perf_counter() + duration
+
+        async def loop(user: VirtualUser):
+            while time.perf_counter() < deadline:
+                name = user.rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    await SCENARIOS[name](user)
+                    ok = True
+                except ScenarioFailed:
+                    ok = False
+                recorder.record_scenario(name, (time.perf_counter() - start) * 1000, ok)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(loop(user) for user in users))
+        return recorder.report(concurrency, time.perf_counter() - start)
+
+
+def seed_database(database_url: str, products: int, users: int, rounds: int) -> None:
+    """Create the catalog and the virtual users' accounts."""
+    db = database_session_factory(database_url)()
+    seed_products(db, products)
+    # Plenty of stock so checkouts never fail on availability
+    db.execute(update(Product).values(stock_quantity=10 ** 9))
+    seed_users(db, users, PASSWORD, rounds, prefix="load")
+    db.close()
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict) -> dict:
+    """Throughput and p95 change per concurrency level and endpoint, in percent."""
+    def change(old, new):
+        return round((new - old) / old * 100, 1) if old else None
+
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    levels = []
+    for level in current["levels"]:
+        old = baseline_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        levels.append({
+            "concurrency": level["concurrency"],
+            "throughput_rps_change_pct": change(old["throughput_rps"], level["throughput_rps"]),
+            "p95_ms_change_pct": change(old["latency"]["p95_ms"], level["latency"]["p95_ms"]),
+            "error_rate": {"baseline": old["error_rate"], "current": level["error_rate"]},
+            "endpoints_p95_ms_change_pct": {
+                name: change(old["endpoints"][name]["latency"]["p95_ms"], stats["latency"]["p95_ms"])
+                for name, stats in level["endpoints"].items()
+                if name in old["endpoints"]
+            },
+        })
+    return {"baseline_commit": baseline.get("commit"), "current_commit": current.get("commit"), "levels": levels}
+
+
+def run(args) -> dict:
+    """Seed the database, boot the app and run every concurrency level."""
+    database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'load_test.db'}"
+    mix = parse_mix(args.mix)
+    if not args.no_seed:
+        seed_database(database_url, args.products, max(args.concurrency), args.bcrypt_rounds)
+
+    env = {"BCRYPT_ROUNDS": str(args.bcrypt_rounds)}
+    env.update(pair.split("=", 1) for pair in args.env)
+    results = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "database": database_url.split("://")[0],
+            "products": args.products,
+            "duration_seconds": args.duration,
+            "mix": mix,
+            "seed": args.seed,
+            "env": env,
+        },
+        "levels": [],
+    }
+    with running_server(database_url, env) as base_url:
+        for concurrency in args.concurrency:
+            results["levels"].append(
+                asyncio.run(run_level(base_url, concurrency, args.duration, mix, args.products, args.seed))
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Database to test (default: temporary SQLite file)")
+    parser.add_argument("--no-seed", action="store_true", help="Use existing data (users load0..loadN must exist)")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the virtual users")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra server setting")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.compare:
+        with open(args.compare) as baseline:
+            results["comparison"] = compare(json.load(baseline), results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
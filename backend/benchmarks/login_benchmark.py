@@ -0,0 +1,81 @@
+"""Measure login throughput and catalog latency during a login burst.
+
+Boots the app with password hashing on the request threads
+(PASSWORD_HASH_WORKERS=0) and with a process pool, then fires concurrent
+logins while a second set of clients browses the catalog. Reports login
+throughput and the catalog latency seen during the burst.
+
+Usage:
+    python -m backend.benchmarks.login_benchmark --workers 4 --concurrency 64 --logins 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import httpx
+from backend.benchmarks.common import database_session_factory, seed_products, seed_users, running_server, drive_load
+
+PASSWORD = "benchmark-password"
+
+
+def seed(database_url: str, users: int, rounds: int) -> None:
+    """Create benchmark users and a small catalog."""
+    db = database_session_factory(database_url)()
+    seed_users(db, users, PASSWORD, rounds)
+    seed_products(db, 500)
+    db.close()
+
+
+async def _run_mode(base_url: str, users: int, concurrency: int, logins: int) -> dict:
+    async def login(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        return await client.post("/api/users/login", json={"username": f"bench{n % users}", "password": PASSWORD})
+
+    async def browse(client: httpx.AsyncClient, n: int) -> httpx.Response:
+        return await client.get(f"/api/products/{n % 500 + 1}")
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await drive_load(client, login, 2, 4)  # warm up
+        login_task = asyncio.create_task(drive_load(client, login, concurrency, logins))
+        await asyncio.sleep(0.5)  # let the burst build up
+        catalog = await drive_load(client, browse, 4, 200)
+        return {"login": await login_task, "catalog_during_burst": catalog}
+
+
+def run(users: int, rounds: int, workers: int, concurrency: int, logins: int) -> dict:
+    """Run the benchmark with and without the hashing pool."""
+    database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'login_benchmark.db'}"
+    seed(database_url, users, rounds)
+
+    results = {"bcrypt_rounds": rounds, "modes": {}}
+    for mode, pool_workers in (("request_thread", 0), (f"process_pool_{workers}", workers)):
+        env = {"BCRYPT_ROUNDS": str(rounds), "PASSWORD_HASH_WORKERS": str(pool_workers)}
+        with running_server(database_url, env) as base_url:
+            results["modes"][mode] = asyncio.run(_run_mode(base_url, users, concurrency, logins))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Hashing processes")
+    parser.add_argument(
+        "--concurrency", type=int, default=64,
+        help="Concurrent logins; above the 40 request threads so a blocked thread pool shows"
+    )
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    results = run(args.users, args.rounds, args.workers, args.concurrency, args.logins)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
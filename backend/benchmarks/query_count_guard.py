@@ -0,0 +1,116 @@
+"""Fail if an endpoint's SQL statement count grows with its result size.
+
+Seeds a throwaway SQLite database with carts and orders of increasing size,
+calls the list endpoints through the API and counts the statements each
+request issues. Any endpoint whose count differs between sizes has an N+1
+lazy load; the script prints the counts and exits non-zero.
+
+Usage:
+    python -m backend.benchmarks.query_count_guard
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.benchmarks.common import sqlite_session_factory, seed_products
+from backend.database import get_db, get_read_db
+from backend.main import app
+from backend.models.cart import Cart
+from backend.models.order import Order, OrderItem, OrderStatus
+from backend.models.user import User
+from backend.utils.auth import create_access_token
+from backend.utils.query_counter import assert_constant_queries
+
+SIZES = [1, 5, 25]
+ITEMS_PER_ORDER = 3
+
+
+def main():
+    path = Path(tempfile.mkdtemp()) / "query_count_guard.db"
+    SessionLocal = sqlite_session_factory(str(path))
+    engine = SessionLocal.kw["bind"]
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    client = TestClient(app)  # not entered: skip startup against the configured database
+
+    db = SessionLocal()
+    seed_products(db, max(SIZES) * ITEMS_PER_ORDER)
+    users = {}
+
+    def setup(size: int) -> None:
+        """Give a fresh user `size` cart lines and `size` orders."""
+        user = User(
+            username=f"guard{size}", email=f"guard{size}@example.com",
+            hashed_password="x", is_admin=True
+        )
+        db.add(user)
+        db.flush()
+        for index in range(size):
+            db.add(Cart(user_id=user.id, product_id=index + 1, quantity=1))
+            order = Order(
+                user_id=user.id, total_amount=10.0, status=OrderStatus.PENDING,
+                shipping_address="1 Guard Street"
+            )
+            db.add(order)
+            db.flush()
+            for item in range(ITEMS_PER_ORDER):
+                db.add(OrderItem(
+                    order_id=order.id, product_id=index * ITEMS_PER_ORDER + item + 1,
+                    quantity=1, price_at_purchase=10.0
+                ))
+        db.commit()
+        users[size] = (user.id, {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"})
+
+    def call(path: str):
+        def exercise(size: int) -> None:
+            user_id, headers = users[size]
+            response = client.get(path.format(limit=size), headers=headers)
+            if response.status_code != 200:
+                raise AssertionError(f"GET {path} returned {response.status_code}: {response.text}")
+        return exercise
+
+    checks = {
+        "GET /api/cart/": call("/api/cart/"),
+        "GET /api/orders/": call("/api/orders/?limit=100"),
+        "GET /api/orders/admin/all": call("/api/orders/admin/all?limit={limit}"),
+        "GET /api/products/": call("/api/products/?limit={limit}"),
+    }
+
+    results, failures = {}, []
+    for name, exercise in checks.items():
+        users.clear()
+        db.query(OrderItem).delete()
+        db.query(Order).delete()
+        db.query(Cart).delete()
+        db.query(User).delete()
+        db.commit()
+        try:
+            results[name] = assert_constant_queries(engine, exercise, SIZES, setup=setup)
+        except AssertionError as e:
+            results[name] = str(e)
+            failures.append(name)
+
+    db.close()
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    print(json.dumps(results, indent=2))
+    if failures:
+        print(f"N+1 queries detected in: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare the ilike product search path with the in-process search index.
+
+Seeds a SQLite database with synthetic products and times the same queries
+through ProductService with SEARCH_BACKEND=like and SEARCH_BACKEND=index.
+SQLite stands in for MySQL; both run the same unindexable '%term%' scan.
+
+Usage:
+    python -m backend.benchmarks.search_benchmark --products 100000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.benchmarks.common import sqlite_session_factory, seed_products, time_calls
+from backend.services.product_service import ProductService, settings
+from backend.services.search_index import product_search_index
+
+QUERIES = [
+    "wireless", "laptop", "shoes", "stainless bottle", "portable OR compact",
+    "smart watch battery", "kettle charger", "zeppelin",
+]
+
+
+def run(products: int, repeat: int, path: str = None) -> dict:
+    """Run the benchmark and return results as a dictionary."""
+    SessionLocal = sqlite_session_factory(path)
+    db = SessionLocal()
+    settings.CATALOG_REPLICA_ENABLED = False
+
+    start = time.perf_counter()
+    seed_products(db, products)
+    seed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    product_search_index.load(db)
+    build_seconds = time.perf_counter() - start
+
+    results = {
+        "products": products,
+        "seed_seconds": round(seed_seconds, 3),
+        "index_build_seconds": round(build_seconds, 3),
+        "index": product_search_index.stats(),
+        "queries": {},
+    }
+
+    for query in QUERIES:
+        per_backend = {}
+        for backend in ("like", "index"):
+            settings.SEARCH_BACKEND = backend
+            per_backend[backend] = time_calls(
+                lambda: ProductService.get_all_products(db, limit=100, search=query),
+                repeat
+            )
+        per_backend["speedup"] = round(per_backend["like"]["mean_ms"] / per_backend["index"]["mean_ms"], 1)
+        results["queries"][query] = per_backend
+
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default=None, help="SQLite file (default: in-memory)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.products, args.repeat, args.db), indent=2))
+
+
+if __name__ == "__main__":
+    main()
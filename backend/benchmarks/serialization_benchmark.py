@@ -0,0 +1,172 @@
+"""Measure the per-request saving of FAST_JSON_RESPONSES on the list endpoints.
+
+Seeds a throwaway SQLite database with a user holding a full cart and a page
+of multi-item orders, then for the product, cart and order listings:
+
+    serialization  time to turn the loaded rows into a response body, using
+                   FastAPI's response_model path vs. the fast path
+    end_to_end     full request time through the app with the setting off/on
+
+It also checks that both paths return identical JSON.
+
+Usage:
+    python -m backend.benchmarks.serialization_benchmark --rows 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from backend.benchmarks.common import sqlite_session_factory, seed_products, summarize, time_calls
+from backend.database import get_db, get_read_db
+from backend.main import app
+from backend.models.cart import Cart
+from backend.models.order import Order, OrderItem, OrderStatus
+from backend.models.user import User
+from backend.schemas import CartItemResponse, CartResponse, OrderResponse, ProductResponse
+from backend.services.cart_service import CartService
+from backend.services.order_service import OrderService
+from backend.services.product_service import ProductService
+from backend.utils.auth import create_access_token
+from backend.utils.fast_json import FastJSONResponse, serialize, settings
+
+ITEMS_PER_ORDER = 4
+
+
+def seed(db, rows: int) -> int:
+    """Create a user with `rows` cart lines and `rows` orders; return the user ID."""
+    seed_products(db, rows * ITEMS_PER_ORDER)
+    user = User(username="serializer", email="serializer@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for index in range(rows):
+        db.add(Cart(user_id=user.id, product_id=index + 1, quantity=2))
+        order = Order(
+            user_id=user.id, total_amount=42.0, status=OrderStatus.SHIPPED,
+            shipping_address="1 Benchmark Street", payment_method="card"
+        )
+        db.add(order)
+        db.flush()
+        db.add_all([
+            OrderItem(order_id=order.id, product_id=index * ITEMS_PER_ORDER + item + 1, quantity=1, price_at_purchase=10.5)
+            for item in range(ITEMS_PER_ORDER)
+        ])
+    db.commit()
+    return user.id
+
+
+def _response_field(path: str):
+    return next(route.response_field for route in app.routes if getattr(route, "path", None) == path)
+
+
+def _default_body(path: str, content) -> bytes:
+    """What FastAPI does with a route's return value: validate, dump, encode."""
+    value = asyncio.run(serialize_response(field=_response_field(path), response_content=content, is_coroutine=True))
+    return JSONResponse(value).body
+
+
+def run(rows: int, repeat: int) -> dict:
+    """Run the benchmark and return results as a dictionary."""
+    SessionLocal = sqlite_session_factory(str(Path(tempfile.mkdtemp()) / "serialization.db"))
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    client = TestClient(app)  # not entered: skip startup against the configured database
+    db = SessionLocal()
+    user_id = seed(db, rows)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+    products = ProductService.get_all_products(db, limit=rows)
+    orders = OrderService.get_user_orders(db, user_id, limit=rows)
+    cart = CartService.get_cart(db, user_id)
+
+    def default_cart() -> bytes:
+        content = CartResponse(
+            items=[CartItemResponse.model_validate(item) for item in cart["items"]],
+            total_items=cart["total_items"],
+            total_price=cart["total_price"]
+        )
+        return _default_body("/api/cart/", content)
+
+    def fast_cart() -> bytes:
+        return FastJSONResponse({**cart, "items": serialize(cart["items"], CartItemResponse)}).body
+
+    cases = {
+        "GET /api/products/": (
+            "/api/products/?limit=%d" % min(rows, 100),
+            lambda: _default_body("/api/products/", products),
+            lambda: FastJSONResponse(serialize(products, ProductResponse)).body,
+        ),
+        "GET /api/orders/": (
+            "/api/orders/?limit=%d" % min(rows, 100),
+            lambda: _default_body("/api/orders/", orders),
+            lambda: FastJSONResponse(serialize(orders, OrderResponse)).body,
+        ),
+        "GET /api/cart/": ("/api/cart/", default_cart, fast_cart),
+    }
+
+    results = {"rows": rows, "items_per_order": ITEMS_PER_ORDER, "endpoints": {}}
+    for name, (url, default_path, fast_path) in cases.items():
+        identical_bodies = json.loads(default_path()) == json.loads(fast_path())
+        default_ser = time_calls(default_path, repeat)
+        fast_ser = time_calls(fast_path, repeat)
+
+        # Alternate the two modes call by call so warm-up and drift affect both equally
+        bodies, samples = {}, {False: [], True: []}
+        for index in range(repeat + 5):
+            for enabled in (False, True):
+                settings.FAST_JSON_RESPONSES = enabled
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                if index >= 5:
+                    samples[enabled].append((time.perf_counter() - start) * 1000)
+                bodies[enabled] = response.json()
+        settings.FAST_JSON_RESPONSES = False
+        timings = {enabled: summarize(values) for enabled, values in samples.items()}
+
+        results["endpoints"][name] = {
+            "identical_json": identical_bodies and bodies[False] == bodies[True],
+            "serialization": {
+                "default_ms": default_ser["mean_ms"],
+                "fast_ms": fast_ser["mean_ms"],
+                "saving_pct": round((1 - fast_ser["mean_ms"] / default_ser["mean_ms"]) * 100, 1),
+            },
+            "end_to_end": {
+                "default_ms": timings[False]["mean_ms"],
+                "fast_ms": timings[True]["mean_ms"],
+                "saving_pct": round((1 - timings[True]["mean_ms"] / timings[False]["mean_ms"]) * 100, 1),
+            },
+        }
+
+    db.close()
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Products, orders and cart lines per listing")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
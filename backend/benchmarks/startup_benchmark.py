@@ -0,0 +1,102 @@
+"""Measure boot time and first-request latency for the startup options.
+
+Seeds a throwaway SQLite database, then boots the app under uvicorn several
+times per configuration. For each boot it reads the server's phase breakdown
+from /health/startup and times the first and second request on each hot
+catalog path, so the cost a cold process puts on its first users is visible:
+
+    default     create_all on every boot, cold pool and caches
+    version     DB_SCHEMA_MODE=version
+    warm        DB_SCHEMA_MODE=version, DB_POOL_WARMUP and STARTUP_WARMUP
+
+Usage:
+    python -m backend.benchmarks.startup_benchmark --products 5000 --runs 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import httpx
+from backend.benchmarks.common import running_server, seed_products, sqlite_session_factory
+
+PATHS = ("/api/products/?limit=100", "/api/products/1", "/api/products/categories")
+
+
+def configurations(pool_warmup: int) -> dict:
+    return {
+        "default": {},
+        "version": {"DB_SCHEMA_MODE": "version"},
+        "warm": {"DB_SCHEMA_MODE": "version", "DB_POOL_WARMUP": str(pool_warmup), "STARTUP_WARMUP": "true"},
+    }
+
+
+def _timed_get(client: httpx.Client, url: str) -> float:
+    start = time.perf_counter()
+    client.get(url).raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def _median(values) -> float:
+    return round(statistics.median(values), 1)
+
+
+def boot(database_url: str, env: dict) -> dict:
+    """Boot the app once; returns its wall-clock boot time, phases and request latencies."""
+    start = time.perf_counter()
+    with running_server(database_url, env) as base_url:
+        boot_ms = (time.perf_counter() - start) * 1000
+        with httpx.Client(base_url=base_url) as client:
+            client.get("/health")  # open the keep-alive connection
+            first = {path: _timed_get(client, path) for path in PATHS}
+            second = {path: _timed_get(client, path) for path in PATHS}
+            startup = client.get("/health/startup").json()
+    return {"boot_ms": boot_ms, "startup": startup, "first_ms": first, "second_ms": second}
+
+
+def run(products: int, runs: int, pool_warmup: int) -> dict:
+    """Run the benchmark and return results as a dictionary."""
+    path = Path(tempfile.mkdtemp()) / "startup.db"
+    db = sqlite_session_factory(str(path))()
+    seed_products(db, products)
+    db.close()
+    database_url = f"sqlite:///{path}"
+    # Record the schema version once, as a deployed database would have it
+    with running_server(database_url):
+        pass
+
+    results = {"products": products, "runs": runs, "configurations": {}}
+    for name, env in configurations(pool_warmup).items():
+        boots = [boot(database_url, env) for _ in range(runs)]
+        phases = dict.fromkeys(phase for result in boots for phase in result["startup"]["phases_ms"])
+        results["configurations"][name] = {
+            "env": env,
+            "boot_ms": _median(result["boot_ms"] for result in boots),
+            "startup_ms": _median(result["startup"]["total_ms"] for result in boots),
+            "phases_ms": {
+                phase: _median(result["startup"]["phases_ms"].get(phase, 0.0) for result in boots)
+                for phase in phases
+            },
+            "first_request_ms": {path: _median(result["first_ms"][path] for result in boots) for path in PATHS},
+            "second_request_ms": {path: _median(result["second_ms"][path] for result in boots) for path in PATHS},
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5, help="Boots per configuration (medians are reported)")
+    parser.add_argument("--pool-warmup", type=int, default=5, help="DB_POOL_WARMUP for the warm configuration")
+    args = parser.parse_args()
+    print(json.dumps(run(args.products, args.runs, args.pool_warmup), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -11,11 +12,53 @@ class Settings(BaseSettings):
     DB_USER: str = "root"
     DB_PASSWORD: str = ""
     DB_NAME: str = "online_shopping"
+    # Full SQLAlchemy URL; overrides the DB_* settings above when set
+    # (e.g. sqlite:///./shop.db for local testing without MySQL)
+    DATABASE_URL: Optional[str] = None
+    # Serve product, cart and order routes with async def handlers on an async
+    # driver (aiomysql for MySQL, aiosqlite for SQLite)
+    DB_ASYNC: bool = False
+    # Read replicas (comma-separated SQLAlchemy URLs) for read-only endpoints:
+    # catalog and order-history reads and exports. DB_REPLICA_POLICY is
+    # "round_robin" or "least_connections"; a replica that fails to connect is
+    # skipped for DB_REPLICA_RETRY_SECONDS. A client that writes reads from the
+    # primary for the next DB_REPLICA_PIN_SECONDS.
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_POLICY: str = "round_robin"
+    DB_REPLICA_PIN_SECONDS: float = 5.0
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
+    # Connection liveness check: "always" (ping on every checkout), "idle" (ping
+    # only connections idle longer than DB_POOL_PING_IDLE_SECONDS) or "never"
+    DB_POOL_LIVENESS: str = "idle"
+    DB_POOL_PING_IDLE_SECONDS: int = 30
+    # Log every SQL statement (synchronous, slow under load)
+    DB_ECHO: bool = False
+    
+    # Startup: DB_SCHEMA_MODE "create" runs create_all on every boot; "version"
+    # checks the recorded schema version with one query and creates/upgrades
+    # only when it is behind. DB_POOL_WARMUP connections per engine (at most
+    # DB_POOL_SIZE) are opened before serving. STARTUP_WARMUP runs the hot
+    # catalog reads once so the first requests find everything warm.
+    DB_SCHEMA_MODE: str = "create"
+    DB_POOL_WARMUP: int = 0
+    STARTUP_WARMUP: bool = False
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # bcrypt work factor; existing hashes are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Processes used for password hashing (0 hashes on the request thread)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Verified JWT payloads kept in memory until the token expires (0 disables)
+    TOKEN_CACHE_SIZE: int = 10000
     
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:8000,http://127.0.0.1:8000"
@@ -23,11 +66,82 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
     
+    # Encode product, cart and order listings straight from ORM rows with orjson,
+    # skipping response_model re-validation
+    FAST_JSON_RESPONSES: bool = False
+    
+    # Response compression: gzip, plus brotli (preferred) when the brotli
+    # package is installed; responses under COMPRESSION_MIN_SIZE bytes are sent as is
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI: bool = True
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Request and SQL metrics served at /metrics in Prometheus text format
+    METRICS_ENABLED: bool = True
+    
+    # Cache-Control max-age for catalog responses; clients revalidate with ETags
+    CATALOG_CACHE_MAX_AGE: int = 0
+    
+    # Catalog replica (in-process copy of the products table)
+    CATALOG_REPLICA_ENABLED: bool = False
+    CATALOG_REPLICA_TTL_SECONDS: int = 60
+    
+    # In-memory category index; rebuilt after this many seconds to pick up
+    # writes from other worker processes
+    CATEGORY_INDEX_TTL_SECONDS: int = 300
+    
+    # Cart storage: "sql" (cart table) or "memory" (in-process, written behind
+    # to the cart table every CART_FLUSH_INTERVAL_SECONDS; 0 = only at checkout
+    # and shutdown). The memory store requires a single worker process.
+    CART_STORE: str = "sql"
+    CART_FLUSH_INTERVAL_SECONDS: float = 2.0
+    CART_STORE_MAX_USERS: int = 100000
+    
+    # Stock reservations: adding to the cart holds the line's quantity for
+    # RESERVATION_TTL_SECONDS (restarted on every change to the line) and
+    # checkout converts the holds; expired holds are released in bulk every
+    # RESERVATION_SWEEP_INTERVAL_SECONDS
+    STOCK_RESERVATIONS_ENABLED: bool = False
+    RESERVATION_TTL_SECONDS: int = 900
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 30.0
+    
+    # Rows per executemany batch / server-side cursor fetch for bulk import and export
+    BULK_BATCH_SIZE: int = 1000
+    
+    # Product search: "like" (substring match), "index" (in-process inverted
+    # index) or "fulltext" (MySQL FULLTEXT index)
+    SEARCH_BACKEND: str = "like"
+    SEARCH_INDEX_TTL_SECONDS: int = 300
+    
     @property
     def database_url(self) -> str:
         """Construct database URL from components."""
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    @property
+    def async_database_url(self) -> str:
+        """Database URL using the async driver for the same database."""
+        return self.async_url(self.database_url)
+    
+    @property
+    def replica_urls_list(self) -> list[str]:
+        """Convert comma-separated replica URLs to list."""
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+    
+    @staticmethod
+    def async_url(url: str) -> str:
+        """The given database URL with the async driver for its dialect."""
+        scheme, rest = url.split("://", 1)
+        dialect = scheme.split("+", 1)[0]
+        async_drivers = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+        if dialect not in async_drivers:
+            raise ValueError(f"No async driver configured for '{dialect}' databases")
+        return f"{dialect}+{async_drivers[dialect]}://{rest}"
+    
     @property
     def allowed_origins_list(self) -> list[str]:
         """Convert comma-separated origins to list."""
@@ -1,37 +1,289 @@
-from sqlalchemy import create_engine
+from typing import Callable, Optional
+from fastapi import Request
+from sqlalchemy import Column, Integer, Table, create_engine, func, inspect, make_url, select, text, DateTime
+from sqlalchemy.dialects.sqlite import DATETIME as SQLiteDateTime
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from backend.config import get_settings
+from backend.utils.db_pool import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool, install_liveness_check
+from backend.utils.db_routing import PrimaryPins, ReplicaRouter, ReplicaTarget, client_key
 
 settings = get_settings()
 
+
+def _engine_options(url: str, poolclass) -> dict:
+    """Pool sizing and liveness options from settings."""
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_LIVENESS == "always",
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps one connection per thread; it has no pool to size
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _create_engine(url: str):
+    """Create a sync engine for url with the configured pool and liveness check."""
+    created = create_engine(url, **_engine_options(url, InstrumentedQueuePool))
+    if settings.DB_POOL_LIVENESS == "idle":
+        install_liveness_check(created, settings.DB_POOL_PING_IDLE_SECONDS)
+    return created
+
+
+def _create_async_engine(url: str):
+    """Create an async engine for url with the configured pool and liveness check."""
+    created = create_async_engine(url, **_engine_options(url, InstrumentedAsyncAdaptedQueuePool))
+    if settings.DB_POOL_LIVENESS == "idle":
+        install_liveness_check(created.sync_engine, settings.DB_POOL_PING_IDLE_SECONDS)
+    return created
+
+
+# Clients that wrote recently read from the primary (shared by the sync and async routers)
+primary_pins = PrimaryPins(settings.DB_REPLICA_PIN_SECONDS)
+
+
+def _replica_router(targets: list) -> ReplicaRouter:
+    return ReplicaRouter(
+        targets,
+        primary_pins,
+        policy=settings.DB_REPLICA_POLICY,
+        retry_seconds=settings.DB_REPLICA_RETRY_SECONDS
+    )
+
+
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,   # Recycle connections after 1 hour
-    echo=settings.ENVIRONMENT == "development"  # Log SQL in development
-)
+engine = _create_engine(settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas used by get_read_db (none unless DB_REPLICA_URLS is set)
+replica_router = _replica_router([
+    ReplicaTarget(f"replica{number}", replica, sessionmaker(autocommit=False, autoflush=False, bind=replica))
+    for number, replica in enumerate(map(_create_engine, settings.replica_urls_list), start=1)
+])
+
+# Async engine and session factory, only created when async mode is enabled
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engines = []
+async_replica_router = _replica_router([])
+if settings.DB_ASYNC:
+    async_engine = _create_async_engine(settings.async_database_url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=True)
+    async_replica_engines = [_create_async_engine(settings.async_url(url)) for url in settings.replica_urls_list]
+    async_replica_router = _replica_router([
+        ReplicaTarget(
+            f"replica{number}", replica.sync_engine,
+            async_sessionmaker(replica, autoflush=False, expire_on_commit=True)
+        )
+        for number, replica in enumerate(async_replica_engines, start=1)
+    ])
+
 # Base class for all models
 Base = declarative_base()
 
 
-def get_db() -> Session:
+def Timestamp() -> DateTime:
+    """
+    Timezone-aware timestamp column type.
+    SQLite (used for local testing) stores server-side CURRENT_TIMESTAMP values
+    without fractional seconds, so bind Python datetimes in the same format there;
+    otherwise comparisons such as pagination cursors never match equal values.
+    """
+    return DateTime(timezone=True).with_variant(
+        SQLiteDateTime(
+            storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+        ),
+        "sqlite"
+    )
+
+
+def get_db(request: Request) -> Session:
     """
     Dependency function to get database session.
     Yields a database session and ensures it's closed after use.
+    With read replicas, a commit pins the client's reads to the primary.
     """
     db = SessionLocal()
+    replica_router.pin_after_commit(db, request)
     try:
         yield db
     finally:
         db.close()
 
 
+def read_session_factory(request: Optional[Request] = None) -> Callable[[], Session]:
+    """
+    Session factory for read-only work: opens a session on a healthy replica
+    (connecting eagerly, so a failed replica is skipped) or on the primary if
+    there is none or the request's client is pinned to it.
+    """
+    key = client_key(request) if request is not None else None
+
+    def open_session() -> Session:
+        for target in replica_router.candidates(key):
+            db = target.session_factory()
+            try:
+                db.connection()
+            except DBAPIError as exc:
+                db.close()
+                replica_router.mark_down(target, exc)
+                continue
+            replica_router.record_read(target)
+            return db
+        replica_router.record_read(None)
+        return SessionLocal()
+
+    return open_session
+
+
+def get_read_db(request: Request) -> Session:
+    """
+    Dependency function to get a session for read-only endpoints, on a read
+    replica when configured (see read_session_factory).
+    """
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db(request: Request) -> AsyncSession:
+    """
+    Dependency function to get an async database session (async mode only).
+    Yields an async session and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        async_replica_router.pin_after_commit(db.sync_session, request)
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncSession:
+    """Async counterpart of get_read_db (async mode only)."""
+    key = client_key(request)
+    for target in async_replica_router.candidates(key):
+        db = target.session_factory()
+        try:
+            await db.connection()
+        except DBAPIError as exc:
+            await db.close()
+            async_replica_router.mark_down(target, exc)
+            continue
+        async_replica_router.record_read(target)
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    async_replica_router.record_read(None)
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Columns added to tables after their first release: create_all only creates
+# missing tables, so init_db adds these to existing ones
+ADDED_COLUMNS = (
+    ("products", "reserved_quantity", "INTEGER NOT NULL DEFAULT 0"),
+    ("products", "version", "INTEGER NOT NULL DEFAULT 1"),
+)
+
+
+def _add_missing_columns() -> None:
+    """Add ADDED_COLUMNS that an existing table does not have yet."""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, column, ddl in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            if column not in {existing["name"] for existing in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _add_missing_indexes() -> None:
+    """
+    Create model indexes that an existing table does not have yet (create_all
+    only indexes the tables it creates). An index is skipped if an existing one
+    already starts with its columns, e.g. the index MySQL creates for a foreign key.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = inspector.get_indexes(table.name)
+        names = {index["name"] for index in existing}
+        for index in table.indexes:
+            columns = [column.name for column in index.columns]
+            covered = not index.unique and any(
+                existing_index["column_names"][:len(columns)] == columns for existing_index in existing
+            )
+            if index.name not in names and not covered:
+                index.create(bind=engine)
+
+
+# Version of the schema the models describe; bump it with every schema change
+# (new table, index or ADDED_COLUMNS entry) so DB_SCHEMA_MODE=version startups
+# apply it. 2: stock reservations. 3: cart and order listing indexes.
+# 4: product row versions.
+SCHEMA_VERSION = 4
+
+# One row per schema version init_db has applied
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("applied_at", Timestamp(), server_default=func.now()),
+)
+
+
+def get_schema_version() -> Optional[int]:
+    """Latest schema version recorded by init_db; None if none is (or the table does not exist)."""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(func.max(schema_version_table.c.version))).scalar()
+    except DBAPIError:
+        return None
+
+
 def init_db():
-    """Initialize database by creating all tables."""
+    """Initialize database by creating all tables, then record SCHEMA_VERSION."""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _add_missing_indexes()
+    with engine.begin() as connection:
+        recorded = connection.execute(
+            select(schema_version_table.c.version).where(schema_version_table.c.version == SCHEMA_VERSION)
+        ).first()
+        if recorded is None:
+            connection.execute(schema_version_table.insert().values(version=SCHEMA_VERSION))
+
+
+def prepare_schema(mode: str = "create") -> str:
+    """
+    Make sure the database schema is current at startup.
+    "create" runs init_db (create_all inspects every table on each boot);
+    "version" reads the recorded schema version with one query and runs
+    init_db only when it is older than SCHEMA_VERSION.
+    Returns "checked" if the schema was already current, else "initialized".
+    """
+    if mode not in ("create", "version"):
+        raise ValueError(f"Unknown schema mode '{mode}'. Use 'create' or 'version'")
+    if mode == "version":
+        version = get_schema_version()
+        if version is not None and version >= SCHEMA_VERSION:
+            return "checked"
+    init_db()
+    return "initialized"
@@ -5,18 +5,19 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from backend.database import engine, Base, SessionLocal
+from backend.database import init_db, SessionLocal
 from backend.models.product import Product
 from backend.models.user import User
 from backend.models.cart import Cart
 from backend.models.order import Order, OrderItem
+from backend.models.reservation import StockReservation
 from backend.utils.auth import hash_password
 
 
 def init_database():
     """Create all database tables."""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    init_db()
     print("Database tables created successfully!")
 
 
@@ -1,11 +1,31 @@
 """Main FastAPI application."""
+import time
+
+# Start of the "imports" phase reported at /health/startup
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from backend.config import get_settings
-from backend.database import init_db
-from backend.routes import products, users, cart, orders
-from backend.utils.exceptions import AppException
+from backend.database import (
+    SCHEMA_VERSION, prepare_schema, SessionLocal, engine, async_engine, async_replica_engines, replica_router,
+    async_replica_router
+)
+from backend.routes import products, users, cart, orders, async_products, async_cart, async_orders
+from backend.services.cart_store import get_cart_store, memory_cart_store
+from backend.services.catalog_replica import catalog_replica
+from backend.services.category_index import category_index
+from backend.services.reservation_service import reservation_sweeper
+from backend.services.search_index import product_search_index
+from backend.utils.auth import start_password_pool, shutdown_password_pool
+from backend.utils.compression import CompressionMiddleware
+from backend.utils.db_pool import pool_stats, pool_metric_lines, warm_async_pool, warm_pool
+from backend.utils.exceptions import AppException, NotFoundException
+from backend.utils.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from backend.utils.pagination import NEXT_CURSOR_HEADER
+from backend.utils.startup import startup_timer, warm_up
+from backend.utils.token_cache import verified_token_cache
 
 settings = get_settings()
 
@@ -18,6 +38,17 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Compress large responses; added first so it is the innermost middleware and
+# its time is included in the request metrics
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_enabled=settings.COMPRESSION_BROTLI,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +56,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Request and SQL metrics for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    for target in replica_router.targets:
+        instrument_engine(target.engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+        for target in async_replica_router.targets:
+            instrument_engine(target.engine)
+
 
 # Exception handler for custom exceptions
 @app.exception_handler(AppException)
@@ -48,18 +91,68 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Include routers
-app.include_router(products.router)
+# Include routers (async mode swaps in async def routes for products, cart and orders)
+product_routes, cart_routes, order_routes = (
+    (async_products, async_cart, async_orders) if settings.DB_ASYNC else (products, cart, orders)
+)
+app.include_router(product_routes.router)
 app.include_router(users.router)
-app.include_router(cart.router)
-app.include_router(orders.router)
+app.include_router(cart_routes.router)
+app.include_router(order_routes.router)
+
+startup_timer.record("imports", time.perf_counter() - IMPORT_STARTED)
+
+
+async def _warm_pools() -> dict:
+    """Open DB_POOL_WARMUP connections in every engine's pool; returns how many each opened."""
+    opened = {"sync": warm_pool(engine, settings.DB_POOL_WARMUP)}
+    for target in replica_router.targets:
+        opened[f"sync-{target.name}"] = warm_pool(target.engine, settings.DB_POOL_WARMUP)
+    if async_engine is not None:
+        opened["async"] = await warm_async_pool(async_engine, settings.DB_POOL_WARMUP)
+        for number, replica in enumerate(async_replica_engines, start=1):
+            opened[f"async-replica{number}"] = await warm_async_pool(replica, settings.DB_POOL_WARMUP)
+    return opened
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
-    init_db()
-    print("Database initialized successfully")
+    """Check the schema, load in-process indexes, warm up and start background workers, timing each phase."""
+    with startup_timer.phase("schema"):
+        startup_timer.details["schema"] = prepare_schema(settings.DB_SCHEMA_MODE)
+    print(f"Database schema {startup_timer.details['schema']} (version {SCHEMA_VERSION})")
+
+    if settings.DB_POOL_WARMUP > 0:
+        with startup_timer.phase("pool_warmup"):
+            startup_timer.details["pool_warmup"] = await _warm_pools()
+    
+    db = SessionLocal()
+    try:
+        if settings.CATALOG_REPLICA_ENABLED:
+            with startup_timer.phase("catalog_replica"):
+                catalog_replica.load(db)
+            print(f"Catalog replica loaded ({catalog_replica.stats()['products']} products)")
+        if settings.SEARCH_BACKEND == "index":
+            with startup_timer.phase("search_index"):
+                product_search_index.load(db)
+            print(f"Search index built ({product_search_index.stats()['documents']} products)")
+        with startup_timer.phase("category_index"):
+            category_index.load(db)
+        print(f"Category index built ({category_index.stats()['categories']} categories)")
+    finally:
+        db.close()
+    
+    with startup_timer.phase("workers"):
+        start_password_pool()
+        if settings.CART_STORE == "memory":
+            memory_cart_store.start(SessionLocal)
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            reservation_sweeper.start(SessionLocal)
+
+    if settings.STARTUP_WARMUP:
+        with startup_timer.phase("warmup"):
+            startup_timer.details["warmup"] = await warm_up(app)
+    print(startup_timer.complete())
 
 
 @app.get("/")
@@ -78,6 +171,98 @@ async def health_check():
     return {"status": "healthy", "environment": settings.ENVIRONMENT}
 
 
+@app.get("/health/catalog")
+async def catalog_replica_stats():
+    """Catalog replica hit/miss and staleness counters."""
+    return catalog_replica.stats()
+
+
+@app.get("/health/categories")
+async def category_index_stats():
+    """Category index size and activity counters."""
+    return category_index.stats()
+
+
+@app.get("/health/cart")
+async def cart_store_stats():
+    """Cart store backend and write-behind counters."""
+    return get_cart_store().stats()
+
+
+@app.get("/health/reservations")
+async def reservation_stats():
+    """Stock reservation settings and sweeper counters."""
+    return reservation_sweeper.stats()
+
+
+@app.get("/health/search")
+async def search_index_stats():
+    """Product search index size and activity counters."""
+    return product_search_index.stats()
+
+
+@app.get("/health/tokens")
+async def token_cache_stats():
+    """Verified-token cache size and hit/miss counters."""
+    return verified_token_cache.stats()
+
+
+@app.get("/health/startup")
+async def startup_stats():
+    """Startup time broken down by phase."""
+    return startup_timer.stats()
+
+
+def _engines() -> dict:
+    """Every engine's sync Engine by name: the primary (sync and async) and the read replicas."""
+    engines = {"sync": engine}
+    engines.update({f"sync-{target.name}": target.engine for target in replica_router.targets})
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+        engines.update({f"async-{target.name}": target.engine for target in async_replica_router.targets})
+    return engines
+
+
+@app.get("/health/pool")
+async def connection_pool_stats():
+    """Connection pool occupancy, checkout wait times and errors."""
+    return {name: pool_stats(pooled) for name, pooled in _engines().items()}
+
+
+@app.get("/health/replicas")
+async def replica_stats():
+    """Read replica health, read routing and primary pin counters."""
+    stats = {"sync": replica_router.stats()}
+    if async_engine is not None:
+        stats["async"] = async_replica_router.stats()
+    return stats
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request, SQL and connection pool metrics in Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise NotFoundException("Metrics are disabled")
+    engines = _engines()
+    return PlainTextResponse(
+        render_metrics((lambda: pool_metric_lines(engines), startup_timer.metric_lines)),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers, flush in-memory carts and release database connections on shutdown."""
+    reservation_sweeper.stop()
+    if settings.CART_STORE == "memory":
+        memory_cart_store.stop(SessionLocal)
+    shutdown_password_pool()
+    if async_engine is not None:
+        await async_engine.dispose()
+        for replica in async_replica_engines:
+            await replica.dispose()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
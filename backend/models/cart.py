@@ -1,19 +1,23 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from backend.database import Base
+from backend.database import Base, Timestamp
 
 
 class Cart(Base):
     """Cart model representing items in a user's shopping cart."""
     
     __tablename__ = "cart"
+    __table_args__ = (
+        # A user's cart, and the (user, product) line lookup when adding to it
+        Index("ix_cart_user_product", "user_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
-    added_at = Column(DateTime(timezone=True), server_default=func.now())
+    added_at = Column(Timestamp(), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="cart_items")
@@ -1,12 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Text, Index, literal_column
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
-from backend.database import Base
+from backend.database import Base, Timestamp
 
 
 class Product(Base):
     """Product model representing items available for purchase."""
     
     __tablename__ = "products"
+    __table_args__ = (
+        # Used by SEARCH_BACKEND=fulltext; only MySQL supports FULLTEXT indexes
+        Index(
+            "ix_products_fulltext", "name", "description", "category",
+            mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, index=True)
@@ -14,9 +22,16 @@ class Product(Base):
     price = Column(Float, nullable=False)
     category = Column(String(100), nullable=False, index=True)
     stock_quantity = Column(Integer, nullable=False, default=0)
+    # Units held by unexpired and not yet swept stock reservations
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")
+    # Stock that can still be added to a cart or ordered (nothing is held without stock reservations)
+    available_quantity = column_property(stock_quantity - reserved_quantity)
     image_url = Column(String(500), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp(), server_default=func.now())
+    updated_at = Column(Timestamp(), onupdate=func.now())
+    # Incremented by every UPDATE of the row, ORM or set-based; unlike updated_at
+    # it changes on two edits within the same second (used for ETags)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
     
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from backend.database import Base, Timestamp
+
+
+class StockReservation(Base):
+    """StockReservation model: stock held for a user's cart line until it expires."""
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # One hold per cart line; its quantity follows the line's quantity
+        UniqueConstraint("user_id", "product_id", name="uq_stock_reservations_user_product"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(Timestamp(), nullable=False, index=True)
+    created_at = Column(Timestamp(), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<StockReservation(id={self.id}, user_id={self.user_id}, product_id={self.product_id}, "
+            f"quantity={self.quantity})>"
+        )
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "product_id": self.product_id,
+            "quantity": self.quantity,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
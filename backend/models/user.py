@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Boolean
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from backend.database import Base
+from backend.database import Base, Timestamp
 
 
 class User(Base):
@@ -18,7 +18,7 @@ class User(Base):
     address = Column(String(500), nullable=True)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp(), server_default=func.now())
     
     # Relationships
     cart_items = relationship("Cart", back_populates="user", cascade="all, delete-orphan")
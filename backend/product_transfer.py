@@ -0,0 +1,78 @@
+"""Bulk product import/export command line tool.
+
+Usage:
+    python -m backend.product_transfer import products.csv [--mode upsert] [--batch-size 5000]
+    python -m backend.product_transfer import - --format ndjson < products.ndjson
+    python -m backend.product_transfer export products.ndjson
+    python -m backend.product_transfer export - --format csv > products.csv
+
+The format is taken from the file extension (.csv, .ndjson/.jsonl) unless
+--format is given; "-" reads stdin / writes stdout. Import prints a JSON
+report with per-batch errors and throughput to stderr.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backend.database import SessionLocal
+# Import every model so the mappers' relationships can be configured
+from backend.models.product import Product
+from backend.models.user import User
+from backend.models.cart import Cart
+from backend.models.order import Order, OrderItem
+from backend.models.reservation import StockReservation
+from backend.services.product_transfer_service import FORMATS, IMPORT_MODES, ProductTransferService, format_for_filename
+
+
+def run_import(args) -> dict:
+    """Import products from args.path into the configured database."""
+    fmt = args.format or format_for_filename(args.path)
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    db = SessionLocal()
+    try:
+        return ProductTransferService.import_products(db, stream, fmt, args.mode, args.batch_size)
+    finally:
+        db.close()
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+def run_export(args) -> dict:
+    """Export every product to args.path."""
+    fmt = args.format or format_for_filename(args.path)
+    output = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+    start = time.perf_counter()
+    written = 0
+    try:
+        for chunk in ProductTransferService.export_products(SessionLocal, fmt, args.batch_size):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    elapsed = time.perf_counter() - start
+    return {"format": fmt, "bytes": written, "seconds": round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help='File to read or write, or "-" for stdin/stdout')
+    parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension, else csv")
+    parser.add_argument("--mode", choices=IMPORT_MODES, default="insert", help="Import only")
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: BULK_BATCH_SIZE")
+    args = parser.parse_args()
+
+    report = run_import(args) if args.command == "import" else run_export(args)
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    if args.command == "import" and report["rejected"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
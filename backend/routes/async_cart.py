@@ -0,0 +1,75 @@
+"""Async cart routes, used instead of backend.routes.cart when DB_ASYNC is enabled."""
+from fastapi import APIRouter, Depends
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.config import get_settings
+from backend.database import get_async_db
+from backend.schemas import CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse, MessageResponse
+from backend.services.async_cart_service import AsyncCartService
+from backend.routes.users import get_current_user_id
+from backend.utils.fast_json import FastJSONResponse, serialize
+from backend.utils.fieldsets import FieldTree, project, sparse_fields
+
+settings = get_settings()
+
+router = APIRouter(prefix="/api/cart", tags=["Cart"])
+
+
+@router.get("/", response_model=CartResponse)
+async def get_cart(
+    fields: Optional[FieldTree] = Depends(sparse_fields(CartItemResponse)),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get current user's cart; fields or view=summary return only some fields of each item."""
+    cart = await AsyncCartService.get_cart(db, user_id, fields)
+    
+    if fields is not None:
+        return FastJSONResponse({**cart, "items": project(cart["items"], fields)})
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse({**cart, "items": serialize(cart["items"], CartItemResponse)})
+    
+    return CartResponse(
+        items=cart["items"],
+        total_items=cart["total_items"],
+        total_price=cart["total_price"]
+    )
+
+
+@router.post("/add", response_model=CartItemResponse, status_code=201)
+async def add_to_cart(
+    cart_item: CartItemCreate,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add an item to the cart."""
+    return await AsyncCartService.add_to_cart(db, user_id, cart_item)
+
+
+@router.put("/update/{item_id}", response_model=CartItemResponse)
+async def update_cart_item(
+    item_id: int,
+    update_data: CartItemUpdate,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update cart item quantity."""
+    return await AsyncCartService.update_cart_item(db, user_id, item_id, update_data)
+
+
+@router.delete("/remove/{item_id}", response_model=MessageResponse)
+async def remove_from_cart(
+    item_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Remove an item from the cart."""
+    await AsyncCartService.remove_from_cart(db, user_id, item_id)
+    return MessageResponse(message="Item removed from cart")
+
+
+@router.delete("/clear", response_model=MessageResponse)
+async def clear_cart(user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
+    """Clear all items from the cart."""
+    await AsyncCartService.clear_cart(db, user_id)
+    return MessageResponse(message="Cart cleared successfully")
@@ -0,0 +1,125 @@
+"""Async order routes, used instead of backend.routes.orders when DB_ASYNC is enabled."""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from backend.config import get_settings
+from backend.database import get_async_db, get_async_read_db, read_session_factory
+from backend.models.order import OrderStatus
+from backend.schemas import OrderCreate, OrderResponse, OrderStatusUpdate, OrderBulkStatusUpdate, OrderBulkStatusReport
+from backend.services.async_order_service import AsyncOrderService
+from backend.services.order_export_service import OrderExportService
+from backend.routes.orders import set_orders_cursor
+from backend.routes.users import get_current_user_id, get_current_admin_id_async
+from backend.utils.fieldsets import FieldTree, sparse_fields, sparse_list_response
+from backend.utils.pagination import decode_time_cursor
+from backend.utils.streaming import attachment_response
+
+settings = get_settings()
+
+router = APIRouter(prefix="/api/orders", tags=["Orders"])
+
+
+@router.post("/checkout", response_model=OrderResponse, status_code=201)
+async def checkout(
+    order_data: OrderCreate,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create an order from cart (checkout)."""
+    return await AsyncOrderService.create_order_from_cart(db, user_id, order_data)
+
+
+@router.get("/", response_model=List[OrderResponse])
+async def get_user_orders(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[FieldTree] = Depends(sparse_fields(OrderResponse)),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get current user's order history; fields or view=summary return only some fields."""
+    before = decode_time_cursor(cursor) if cursor else None
+    orders = await AsyncOrderService.get_user_orders(
+        db, user_id, skip=0 if cursor else skip, limit=limit, before=before, fields=fields
+    )
+    set_orders_cursor(response, orders, limit)
+    return sparse_list_response(orders, OrderResponse, fields, response)
+
+
+@router.get("/admin/all", response_model=List[OrderResponse])
+async def get_all_orders(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    status: Optional[OrderStatus] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[FieldTree] = Depends(sparse_fields(OrderResponse)),
+    admin_id: int = Depends(get_current_admin_id_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all orders with optional status filter (admin only); fields or view=summary return only some fields."""
+    before = decode_time_cursor(cursor) if cursor else None
+    orders = await AsyncOrderService.get_all_orders(
+        db, skip=0 if cursor else skip, limit=limit, status=status, before=before, fields=fields
+    )
+    set_orders_cursor(response, orders, limit)
+    return sparse_list_response(orders, OrderResponse, fields, response)
+
+
+@router.get("/admin/export", response_class=StreamingResponse)
+async def export_orders(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = Query(None, description="Orders created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Orders created before this time"),
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id_async)
+):
+    """
+    Stream orders with their items as CSV (one row per item) or NDJSON (one
+    order per line), optionally filtered by status and creation time (admin only).
+    """
+    chunks = OrderExportService.export_orders(
+        read_session_factory(request), fmt, status, created_from, created_to, batch_size
+    )
+    return attachment_response(chunks, f"orders.{fmt}", fmt)
+
+
+@router.post("/admin/status", response_model=OrderBulkStatusReport)
+async def bulk_update_order_status(
+    bulk_update: OrderBulkStatusUpdate,
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Move many orders to a status at once, selected by order_ids or by filter
+    (admin only). Only allowed transitions are applied; the report counts
+    updated, unchanged and rejected orders.
+    """
+    return await AsyncOrderService.bulk_update_status(db, bulk_update, batch_size)
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a specific order by ID."""
+    return await AsyncOrderService.get_order_by_id(db, order_id, user_id=user_id)
+
+
+@router.put("/{order_id}/status", response_model=OrderResponse)
+async def update_order_status(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update order status (admin only - authentication to be added)."""
+    return await AsyncOrderService.update_order_status(db, order_id, status_update)
@@ -0,0 +1,139 @@
+"""Async product routes, used instead of backend.routes.products when DB_ASYNC is enabled."""
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from backend.config import get_settings
+from backend.database import get_async_db, get_async_read_db, read_session_factory
+from backend.routes.users import get_current_admin_id_async
+from backend.schemas import CategoryCount, ProductResponse, ProductCreate, ProductUpdate, MessageResponse, ProductImportReport
+from backend.services.async_product_service import AsyncProductService
+from backend.services.product_service import ProductService
+from backend.services.product_transfer_service import ProductTransferService
+from backend.utils.conditional import (
+    check_categories_not_modified, check_listing_not_modified, check_product_not_modified
+)
+from backend.utils.fieldsets import FieldTree, sparse_fields, sparse_list_response
+from backend.utils.pagination import decode_id_cursor, decode_offset_cursor, set_next_cursor
+from backend.utils.streaming import attachment_response, format_from_content_type, spool_request_body
+
+settings = get_settings()
+
+router = APIRouter(prefix="/api/products", tags=["Products"])
+
+
+@router.get("/", response_model=List[ProductResponse])
+async def get_products(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[FieldTree] = Depends(sparse_fields(ProductResponse)),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all products with optional filtering and pagination; fields or view=summary return only some fields."""
+    if ProductService.is_ranked_search(search):
+        # Relevance order has no stable key, so ranked cursors hold an offset
+        offset = decode_offset_cursor(cursor) if cursor else skip
+        products = await AsyncProductService.get_all_products(
+            db, skip=offset, limit=limit, category=category, search=search, fields=fields
+        )
+        not_modified = check_listing_not_modified(request, response, products)
+        if not_modified:
+            return not_modified
+        if len(products) == limit:
+            set_next_cursor(response, {"offset": offset + limit})
+        return sparse_list_response(products, ProductResponse, fields, response)
+    
+    after_id = decode_id_cursor(cursor) if cursor else None
+    products = await AsyncProductService.get_all_products(
+        db, skip=0 if cursor else skip, limit=limit, category=category, search=search, after_id=after_id,
+        fields=fields
+    )
+    not_modified = check_listing_not_modified(request, response, products)
+    if not_modified:
+        return not_modified
+    if len(products) == limit:
+        set_next_cursor(response, {"id": products[-1].id})
+    return sparse_list_response(products, ProductResponse, fields, response)
+
+
+@router.get("/categories", response_model=Union[List[str], List[CategoryCount]])
+async def get_categories(
+    request: Request,
+    response: Response,
+    counts: bool = Query(False, description="Return each category with its product and in-stock counts"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all product categories, optionally with product counts."""
+    not_modified = check_categories_not_modified(request, response, await AsyncProductService.get_categories_version(db))
+    if not_modified:
+        return not_modified
+    return await AsyncProductService.get_categories(db, with_counts=counts)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_products(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id_async)
+):
+    """Stream every product as CSV or NDJSON (admin only)."""
+    # The export reads through its own (sync) session on a threadpool thread,
+    # keeping a server-side cursor open for as long as the download takes
+    chunks = ProductTransferService.export_products(read_session_factory(request), fmt, batch_size)
+    return attachment_response(chunks, f"products.{fmt}", fmt)
+
+
+@router.post("/import", response_model=ProductImportReport)
+async def import_products(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="Defaults to the Content-Type"),
+    mode: str = Query("insert", pattern="^(insert|upsert)$", description="upsert updates rows whose id exists"),
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk-import products from a CSV (with header row) or NDJSON request body (admin only).
+    Invalid rows are skipped and reported per batch.
+    """
+    body = await spool_request_body(request)
+    fmt = fmt or format_from_content_type(request.headers.get("content-type"))
+    try:
+        return await AsyncProductService.import_products(db, body, fmt, mode, batch_size)
+    finally:
+        body.close()
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(product_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    """Get a specific product by ID."""
+    product = await AsyncProductService.get_product_by_id(db, product_id)
+    not_modified = check_product_not_modified(request, response, product)
+    if not_modified:
+        return not_modified
+    return product
+
+
+@router.post("/", response_model=ProductResponse, status_code=201)
+async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new product (admin only - authentication to be added)."""
+    return await AsyncProductService.create_product(db, product)
+
+
+@router.put("/{product_id}", response_model=ProductResponse)
+async def update_product(product_id: int, product: ProductUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update a product (admin only - authentication to be added)."""
+    return await AsyncProductService.update_product(db, product_id, product)
+
+
+@router.delete("/{product_id}", response_model=MessageResponse)
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a product (admin only - authentication to be added)."""
+    await AsyncProductService.delete_product(db, product_id)
+    return MessageResponse(message=f"Product {product_id} deleted successfully")
@@ -1,25 +1,38 @@
 """Cart routes for the API."""
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from backend.config import get_settings
 from backend.database import get_db
 from backend.schemas import CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse, MessageResponse
 from backend.services.cart_service import CartService
 from backend.routes.users import get_current_user_id
+from backend.utils.fast_json import FastJSONResponse, serialize
+from backend.utils.fieldsets import FieldTree, project, sparse_fields
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/cart", tags=["Cart"])
 
 
 @router.get("/", response_model=CartResponse)
-def get_cart(user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    """Get current user's cart."""
-    cart_items = CartService.get_user_cart(db, user_id)
-    cart_total = CartService.get_cart_total(db, user_id)
+def get_cart(
+    fields: Optional[FieldTree] = Depends(sparse_fields(CartItemResponse)),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Get current user's cart; fields or view=summary return only some fields of each item."""
+    cart = CartService.get_cart(db, user_id, fields)
+    
+    if fields is not None:
+        return FastJSONResponse({**cart, "items": project(cart["items"], fields)})
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse({**cart, "items": serialize(cart["items"], CartItemResponse)})
     
     return CartResponse(
-        items=[CartItemResponse.model_validate(item) for item in cart_items],
-        total_items=cart_total["total_items"],
-        total_price=cart_total["total_price"]
+        items=[CartItemResponse.model_validate(item) for item in cart["items"]],
+        total_items=cart["total_items"],
+        total_price=cart["total_price"]
     )
 
 
@@ -1,37 +1,121 @@
 """Product routes for the API."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from backend.database import get_db
-from backend.schemas import ProductResponse, ProductCreate, ProductUpdate, MessageResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Union
+from backend.config import get_settings
+from backend.database import get_db, get_read_db, read_session_factory
+from backend.routes.users import get_current_admin_id
+from backend.schemas import CategoryCount, ProductResponse, ProductCreate, ProductUpdate, MessageResponse, ProductImportReport
 from backend.services.product_service import ProductService
+from backend.services.product_transfer_service import ProductTransferService
+from backend.utils.conditional import (
+    check_categories_not_modified, check_listing_not_modified, check_product_not_modified
+)
+from backend.utils.fieldsets import FieldTree, sparse_fields, sparse_list_response
+from backend.utils.pagination import decode_id_cursor, decode_offset_cursor, set_next_cursor
+from backend.utils.streaming import attachment_response, format_from_content_type, spool_request_body
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
 
 @router.get("/", response_model=List[ProductResponse])
 def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[FieldTree] = Depends(sparse_fields(ProductResponse)),
+    db: Session = Depends(get_read_db)
+):
+    """Get all products with optional filtering and pagination; fields or view=summary return only some fields."""
+    if ProductService.is_ranked_search(search):
+        # Relevance order has no stable key, so ranked cursors hold an offset
+        offset = decode_offset_cursor(cursor) if cursor else skip
+        products = ProductService.get_all_products(
+            db, skip=offset, limit=limit, category=category, search=search, fields=fields
+        )
+        not_modified = check_listing_not_modified(request, response, products)
+        if not_modified:
+            return not_modified
+        if len(products) == limit:
+            set_next_cursor(response, {"offset": offset + limit})
+        return sparse_list_response(products, ProductResponse, fields, response)
+    
+    after_id = decode_id_cursor(cursor) if cursor else None
+    products = ProductService.get_all_products(
+        db, skip=0 if cursor else skip, limit=limit, category=category, search=search, after_id=after_id,
+        fields=fields
+    )
+    not_modified = check_listing_not_modified(request, response, products)
+    if not_modified:
+        return not_modified
+    if len(products) == limit:
+        set_next_cursor(response, {"id": products[-1].id})
+    return sparse_list_response(products, ProductResponse, fields, response)
+
+
+@router.get("/categories", response_model=Union[List[str], List[CategoryCount]])
+def get_categories(
+    request: Request,
+    response: Response,
+    counts: bool = Query(False, description="Return each category with its product and in-stock counts"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all products with optional filtering and pagination."""
-    products = ProductService.get_all_products(db, skip=skip, limit=limit, category=category, search=search)
-    return products
+    """Get all product categories, optionally with product counts."""
+    not_modified = check_categories_not_modified(request, response, ProductService.get_categories_version(db))
+    if not_modified:
+        return not_modified
+    return ProductService.get_categories(db, with_counts=counts)
 
 
-@router.get("/categories", response_model=List[str])
-def get_categories(db: Session = Depends(get_db)):
-    """Get all product categories."""
-    return ProductService.get_categories(db)
+@router.get("/export", response_class=StreamingResponse)
+def export_products(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id)
+):
+    """Stream every product as CSV or NDJSON (admin only)."""
+    chunks = ProductTransferService.export_products(read_session_factory(request), fmt, batch_size)
+    return attachment_response(chunks, f"products.{fmt}", fmt)
+
+
+@router.post("/import", response_model=ProductImportReport)
+async def import_products(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="Defaults to the Content-Type"),
+    mode: str = Query("insert", pattern="^(insert|upsert)$", description="upsert updates rows whose id exists"),
+    batch_size: int = Query(settings.BULK_BATCH_SIZE, ge=1, le=50000),
+    admin_id: int = Depends(get_current_admin_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-import products from a CSV (with header row) or NDJSON request body (admin only).
+    Invalid rows are skipped and reported per batch.
+    """
+    body = await spool_request_body(request)
+    fmt = fmt or format_from_content_type(request.headers.get("content-type"))
+    try:
+        return await run_in_threadpool(ProductTransferService.import_products, db, body, fmt, mode, batch_size)
+    finally:
+        body.close()
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Get a specific product by ID."""
-    return ProductService.get_product_by_id(db, product_id)
+    product = ProductService.get_product_by_id(db, product_id)
+    not_modified = check_product_not_modified(request, response, product)
+    if not_modified:
+        return not_modified
+    return product
 
 
 @router.post("/", response_model=ProductResponse, status_code=201)
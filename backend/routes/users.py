@@ -1,23 +1,27 @@
 """User routes for the API."""
 from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from backend.database import get_db
+from backend.database import get_db, get_async_db
+from backend.models.user import User
 from backend.schemas import UserCreate, UserResponse, UserLogin, Token, UserUpdate, MessageResponse
 from backend.services.user_service import UserService
-from backend.utils.auth import decode_access_token
-from backend.utils.exceptions import UnauthorizedException
+from backend.utils.auth import decode_access_token, hash_password_async, verify_and_update_password_async
+from backend.utils.token_cache import verified_token_cache
+from backend.utils.exceptions import UnauthorizedException, ForbiddenException, NotFoundException
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
 
-def get_current_user_id(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)) -> int:
-    """Dependency to get current user ID from JWT token."""
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> int:
+    """Dependency to get current user ID from JWT token (no database access, cached verification)."""
     if not authorization or not authorization.startswith("Bearer "):
         raise UnauthorizedException("Missing or invalid authorization header")
     
     token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
+    payload = verified_token_cache.get_or_verify(token, decode_access_token)
     
     if not payload:
         raise UnauthorizedException("Invalid or expired token")
@@ -29,16 +33,55 @@ def get_current_user_id(authorization: Optional[str] = Header(None), db: Session
     return int(user_id)
 
 
+def get_current_admin_id(user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)) -> int:
+    """Dependency to require an authenticated admin user."""
+    user = UserService.get_user_by_id(db, user_id)
+    if not user.is_admin:
+        raise ForbiddenException("Admin privileges required")
+    return user_id
+
+
+async def get_current_admin_id_async(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> int:
+    """Async mode variant of get_current_admin_id."""
+    user = await db.get(User, user_id)
+    if not user:
+        raise NotFoundException(f"User with ID {user_id} not found")
+    if not user.is_admin:
+        raise ForbiddenException("Admin privileges required")
+    return user_id
+
+
+async def _in_session(db: Session, fn, *args):
+    """
+    Run a sync service call on a threadpool thread, then close the session so
+    its connection goes back to the pool (the session stays usable).
+    """
+    def call():
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    
+    return await run_in_threadpool(call)
+
+
 @router.post("/register", response_model=UserResponse, status_code=201)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user."""
-    return UserService.create_user(db, user)
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    """Register a new user. No database connection is held while the password is hashed."""
+    await _in_session(db, UserService.check_new_user, user)
+    hashed_password = await hash_password_async(user.password)
+    return await _in_session(db, UserService.create_user, user, hashed_password)
 
 
 @router.post("/login", response_model=Token)
-def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
-    """Login user and return access token."""
-    user, access_token = UserService.authenticate_user(db, credentials.username, credentials.password)
+async def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
+    """Login user and return access token. No database connection is held while the password is checked."""
+    user = await _in_session(db, UserService.get_login_user, credentials.username)
+    valid, new_hash = await verify_and_update_password_async(credentials.password, user.hashed_password)
+    user, access_token = await _in_session(db, UserService.complete_login, user, valid, new_hash)
     return Token(access_token=access_token)
 
 
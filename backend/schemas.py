@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response validation."""
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import ClassVar, Dict, Optional, List
 from datetime import datetime
 from backend.models.order import OrderStatus
 
@@ -35,15 +35,58 @@ class ProductUpdate(BaseModel):
 class ProductResponse(ProductBase):
     """Schema for product response."""
     id: int
+    # stock_quantity minus the units held for carts (see STOCK_RESERVATIONS_ENABLED)
+    available_quantity: int
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
     
+    # Fields returned with view=summary (see backend.utils.fieldsets)
+    summary_fields: ClassVar[str] = "id,name,price,image_url"
+    
     class Config:
         from_attributes = True
 
 
 # ============= User Schemas =============
 
+class ImportRowError(BaseModel):
+    """A rejected row of a bulk import."""
+    line: int
+    error: str
+
+
+class ImportBatchReport(BaseModel):
+    """A bulk import batch that had rejected rows or failed to write."""
+    batch: int
+    lines: List[int]
+    rejected: int
+    batch_error: Optional[str] = None
+    errors: List[ImportRowError]
+
+
+class ProductImportReport(BaseModel):
+    """Schema for bulk product import results."""
+    format: str
+    mode: str
+    batch_size: int
+    rows: int
+    inserted: int
+    updated: int
+    rejected: int
+    batches: int
+    failed_batches: int
+    seconds: float
+    rows_per_second: Optional[float]
+    errors: List[ImportBatchReport]
+
+
+class CategoryCount(BaseModel):
+    """Schema for a category with its product counts."""
+    category: str
+    product_count: int
+    in_stock_count: int
+
+
 class UserBase(BaseModel):
     """Base user schema."""
     username: str = Field(..., min_length=3, max_length=100)
@@ -109,6 +152,8 @@ class CartItemResponse(BaseModel):
     added_at: Optional[datetime]
     product: Optional[ProductResponse]
     
+    summary_fields: ClassVar[str] = "id,product_id,quantity,product.id,product.name,product.price,product.image_url"
+    
     class Config:
         from_attributes = True
 
@@ -152,6 +197,11 @@ class OrderResponse(BaseModel):
     updated_at: Optional[datetime]
     items: List[OrderItemResponse] = []
     
+    summary_fields: ClassVar[str] = (
+        "id,status,total_amount,created_at,items.id,items.product_id,items.quantity,items.price_at_purchase,"
+        "items.product.id,items.product.name,items.product.image_url"
+    )
+    
     class Config:
         from_attributes = True
 
@@ -161,6 +211,34 @@ class OrderStatusUpdate(BaseModel):
     status: OrderStatus
 
 
+class OrderStatusFilter(BaseModel):
+    """Orders selected by a bulk status change; at least one condition is required."""
+    status: Optional[OrderStatus] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class OrderBulkStatusUpdate(BaseModel):
+    """Schema for moving many orders to a status, given by ID or by filter (not both)."""
+    status: OrderStatus
+    order_ids: Optional[List[int]] = Field(None, min_length=1, max_length=100000)
+    filter: Optional[OrderStatusFilter] = None
+
+
+class OrderBulkStatusReport(BaseModel):
+    """Schema for bulk order status change results."""
+    status: str
+    matched: int
+    updated: int
+    unchanged: int
+    rejected: int
+    not_found: int
+    rejected_by_status: Dict[str, int]
+    rejected_ids: List[int]
+    batches: int
+    seconds: float
+
+
 # ============= Generic Response Schemas =============
 
 class MessageResponse(BaseModel):
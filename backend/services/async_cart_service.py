@@ -0,0 +1,60 @@
+"""Async cart service used by the routes when DB_ASYNC is enabled."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from backend.schemas import CartItemCreate, CartItemUpdate, CartItemResponse
+from backend.services.cart_service import CartService
+from backend.utils.async_db import run_service
+from backend.utils.fieldsets import FieldTree
+
+
+class AsyncCartService:
+    """Async counterpart of CartService, sharing its query logic."""
+    
+    @staticmethod
+    async def get_user_cart(db: AsyncSession, user_id: int) -> List[CartItemResponse]:
+        """Get all items in user's cart."""
+        return await run_service(db, CartService.get_user_cart, user_id, schema=CartItemResponse)
+    
+    @staticmethod
+    async def get_cart(db: AsyncSession, user_id: int, fields: Optional[FieldTree] = None) -> dict:
+        """
+        Get the user's cart lines (as CartItemResponse) and totals with a single
+        joined query. With fields, the lines are rows with only those columns
+        loaded, for fieldset_response.
+        """
+        def load(session):
+            cart = CartService.get_cart(session, user_id, fields)
+            if fields is None:
+                cart["items"] = [CartItemResponse.model_validate(item) for item in cart["items"]]
+            return cart
+        
+        return await run_service(db, load)
+    
+    @staticmethod
+    async def add_to_cart(db: AsyncSession, user_id: int, cart_item: CartItemCreate) -> CartItemResponse:
+        """Add an item to the cart or update quantity if already exists."""
+        return await run_service(db, CartService.add_to_cart, user_id, cart_item, schema=CartItemResponse)
+    
+    @staticmethod
+    async def update_cart_item(
+        db: AsyncSession, user_id: int, item_id: int, update_data: CartItemUpdate
+    ) -> CartItemResponse:
+        """Update cart item quantity."""
+        return await run_service(
+            db, CartService.update_cart_item, user_id, item_id, update_data, schema=CartItemResponse
+        )
+    
+    @staticmethod
+    async def remove_from_cart(db: AsyncSession, user_id: int, item_id: int) -> None:
+        """Remove an item from the cart."""
+        await run_service(db, CartService.remove_from_cart, user_id, item_id)
+    
+    @staticmethod
+    async def clear_cart(db: AsyncSession, user_id: int) -> None:
+        """Clear all items from user's cart."""
+        await run_service(db, CartService.clear_cart, user_id)
+    
+    @staticmethod
+    async def get_cart_total(db: AsyncSession, user_id: int) -> dict:
+        """Calculate cart total price and item count."""
+        return await run_service(db, CartService.get_cart_total, user_id)
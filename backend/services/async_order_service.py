@@ -0,0 +1,74 @@
+"""Async order service used by the routes when DB_ASYNC is enabled."""
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from backend.models.order import OrderStatus
+from backend.schemas import OrderCreate, OrderResponse, OrderStatusUpdate, OrderBulkStatusUpdate
+from backend.services.order_service import OrderService
+from backend.utils.async_db import run_service
+from backend.utils.fieldsets import FieldTree
+
+
+class AsyncOrderService:
+    """Async counterpart of OrderService, sharing its query logic."""
+    
+    @staticmethod
+    async def create_order_from_cart(db: AsyncSession, user_id: int, order_data: OrderCreate) -> OrderResponse:
+        """Create an order from user's cart (checkout)."""
+        return await run_service(
+            db, OrderService.create_order_from_cart, user_id, order_data, schema=OrderResponse
+        )
+    
+    @staticmethod
+    async def get_user_orders(
+        db: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        before: Optional[Tuple[datetime, int]] = None,
+        fields: Optional[FieldTree] = None
+    ) -> List[OrderResponse]:
+        """
+        Get all orders for a user, newest first. With fields, returns the rows
+        with only those columns and relationships loaded, for fieldset_response.
+        """
+        return await run_service(
+            db, OrderService.get_user_orders, user_id, schema=None if fields is not None else OrderResponse,
+            skip=skip, limit=limit, before=before, fields=fields
+        )
+    
+    @staticmethod
+    async def get_order_by_id(db: AsyncSession, order_id: int, user_id: int = None) -> OrderResponse:
+        """Get an order by ID."""
+        return await run_service(db, OrderService.get_order_by_id, order_id, user_id=user_id, schema=OrderResponse)
+    
+    @staticmethod
+    async def update_order_status(
+        db: AsyncSession, order_id: int, status_update: OrderStatusUpdate
+    ) -> OrderResponse:
+        """Update order status (admin only)."""
+        return await run_service(
+            db, OrderService.update_order_status, order_id, status_update, schema=OrderResponse
+        )
+    
+    @staticmethod
+    async def bulk_update_status(
+        db: AsyncSession, bulk_update: OrderBulkStatusUpdate, batch_size: Optional[int] = None
+    ) -> dict:
+        """Move many orders to a status at once (admin only)."""
+        return await run_service(db, OrderService.bulk_update_status, bulk_update, batch_size)
+    
+    @staticmethod
+    async def get_all_orders(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        status: OrderStatus = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        fields: Optional[FieldTree] = None
+    ) -> List[OrderResponse]:
+        """Get all orders (admin only) with optional status filter, newest first (see get_user_orders for fields)."""
+        return await run_service(
+            db, OrderService.get_all_orders, schema=None if fields is not None else OrderResponse,
+            skip=skip, limit=limit, status=status, before=before, fields=fields
+        )
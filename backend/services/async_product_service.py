@@ -0,0 +1,72 @@
+"""Async product service used by the routes when DB_ASYNC is enabled."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO, List, Optional
+from backend.models.product import Product
+from backend.schemas import ProductCreate, ProductUpdate, ProductResponse
+from backend.services.product_service import ProductService
+from backend.services.product_transfer_service import ProductTransferService
+from backend.utils.async_db import run_service
+from backend.utils.fieldsets import FieldTree
+
+
+class AsyncProductService:
+    """Async counterpart of ProductService, sharing its query logic."""
+    
+    @staticmethod
+    async def get_all_products(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        after_id: Optional[int] = None,
+        fields: Optional[FieldTree] = None
+    ) -> List[Product]:
+        """
+        Get all products with optional filtering and pagination. Products have
+        no relationships, so the rows are returned as loaded (the routes read
+        their versions for the ETag); with fields, only those columns are loaded.
+        """
+        return await run_service(
+            db, ProductService.get_all_products,
+            skip=skip, limit=limit, category=category, search=search, after_id=after_id, fields=fields
+        )
+    
+    @staticmethod
+    async def get_product_by_id(db: AsyncSession, product_id: int) -> Product:
+        """Get a product by ID (the row, as in get_all_products)."""
+        return await run_service(db, ProductService.get_product_by_id, product_id)
+    
+    @staticmethod
+    async def create_product(db: AsyncSession, product_data: ProductCreate) -> ProductResponse:
+        """Create a new product."""
+        return await run_service(db, ProductService.create_product, product_data, schema=ProductResponse)
+    
+    @staticmethod
+    async def update_product(db: AsyncSession, product_id: int, product_data: ProductUpdate) -> ProductResponse:
+        """Update an existing product."""
+        return await run_service(
+            db, ProductService.update_product, product_id, product_data, schema=ProductResponse
+        )
+    
+    @staticmethod
+    async def delete_product(db: AsyncSession, product_id: int) -> None:
+        """Delete a product."""
+        await run_service(db, ProductService.delete_product, product_id)
+    
+    @staticmethod
+    async def get_categories_version(db: AsyncSession) -> str:
+        """Get the category index's version, for the categories ETag."""
+        return await run_service(db, ProductService.get_categories_version)
+    
+    @staticmethod
+    async def get_categories(db: AsyncSession, with_counts: bool = False) -> List:
+        """Get all unique product categories, optionally with product counts."""
+        return await run_service(db, ProductService.get_categories, with_counts)
+    
+    @staticmethod
+    async def import_products(
+        db: AsyncSession, stream: BinaryIO, fmt: str, mode: str, batch_size: Optional[int] = None
+    ) -> dict:
+        """Bulk-import products from a CSV or NDJSON byte stream."""
+        return await run_service(db, ProductTransferService.import_products, stream, fmt, mode, batch_size)
@@ -1,121 +1,171 @@
 """Cart service containing business logic for shopping cart operations."""
 from sqlalchemy.orm import Session
-from typing import List
-from backend.models.cart import Cart
-from backend.models.product import Product
+from typing import Any, Callable, List, Optional
+from sqlalchemy.exc import IntegrityError
+from backend.config import get_settings
 from backend.schemas import CartItemCreate, CartItemUpdate
 from backend.utils.exceptions import NotFoundException, BadRequestException
+from backend.services.cart_store import cart_totals, get_cart_store
 from backend.services.product_service import ProductService
+from backend.services.reservation_service import ReservationService
+from backend.utils.fieldsets import FieldTree, merge_fields
+
+settings = get_settings()
+
+# Columns cart_totals reads from each item
+TOTALS_FIELDS = {"quantity": None, "product": {"price": None}}
 
 
 class CartService:
-    """Service class for cart operations."""
+    """Service class for cart operations; storage is delegated to the configured CartStore."""
     
     @staticmethod
-    def get_user_cart(db: Session, user_id: int) -> List[Cart]:
-        """Get all items in user's cart."""
-        return db.query(Cart).filter(Cart.user_id == user_id).all()
+    def get_user_cart(db: Session, user_id: int, fields: Optional[FieldTree] = None) -> List:
+        """Get all items in user's cart, with their products loaded (only fields, if given)."""
+        return get_cart_store().list_items(db, user_id, fields)
     
     @staticmethod
-    def add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate) -> Cart:
-        """Add an item to the cart or update quantity if already exists."""
-        # Verify product exists and has sufficient stock
-        product = ProductService.get_product_by_id(db, cart_item.product_id)
-        
-        if product.stock_quantity < cart_item.quantity:
+    def get_cart(db: Session, user_id: int, fields: Optional[FieldTree] = None) -> dict:
+        """
+        Get the user's cart lines and totals with a single joined query.
+        Returns a dict shaped like CartResponse, with cart items as items.
+        With fields, only those columns of the items are loaded, plus what the totals need.
+        """
+        if fields is not None:
+            fields = merge_fields(fields, TOTALS_FIELDS)
+        cart_items = CartService.get_user_cart(db, user_id, fields)
+        return {"items": cart_items, **cart_totals(cart_items)}
+    
+    @staticmethod
+    def _check_stock(db: Session, user_id: int, product, quantity: int) -> None:
+        """
+        Make sure the line's new quantity is in stock. With stock reservations
+        enabled this places (or resizes) the line's hold, which fails if not
+        enough unheld stock is left; the hold is committed with the cart write
+        (see _commit_cart_change).
+        """
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            ReservationService.hold(db, user_id, product, quantity, commit=False)
+        elif product.available_quantity < quantity:
             raise BadRequestException(
-                f"Insufficient stock for {product.name}. Available: {product.stock_quantity}"
+                f"Insufficient stock for {product.name}. Available: {product.available_quantity}"
             )
+    
+    @staticmethod
+    def _commit_cart_change(db: Session, product_ids: List[int]) -> None:
+        """
+        Commit the holds of a cart change. The SQL store already committed them
+        with the cart row; the memory store keeps lines out of the database, so
+        the holds are committed here. Then update the replica's available stock.
+        """
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            db.commit()
+            ProductService.refresh_replica(db, product_ids)
+    
+    @staticmethod
+    def _retry_hold_conflict(db: Session, change: Callable[[], Any]) -> Any:
+        """
+        Run a cart change that places a hold. Two concurrent first adds of a line
+        can both find no hold to lock, and the second insert then hits the hold's
+        unique key once the first has committed its hold and line: roll back and
+        run the change again, now as a change to that line.
+        """
+        try:
+            return change()
+        except IntegrityError:
+            if not settings.STOCK_RESERVATIONS_ENABLED:
+                raise
+            db.rollback()
+            return change()
+    
+    @staticmethod
+    def add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate):
+        """Add an item to the cart or update quantity if already exists."""
+        return CartService._retry_hold_conflict(db, lambda: CartService._add_to_cart(db, user_id, cart_item))
+    
+    @staticmethod
+    def _add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate):
+        store = get_cart_store()
+        # Verify product exists
+        product = ProductService.get_product_by_id(db, cart_item.product_id)
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            # Concurrent adds of this product wait here, so the line lookup below sees theirs
+            ReservationService.lock_product(db, product.id)
         
         # Check if item already in cart
-        existing_item = db.query(Cart).filter(
-            Cart.user_id == user_id,
-            Cart.product_id == cart_item.product_id
-        ).first()
+        existing_item = store.find_item(db, user_id, cart_item.product_id)
         
         if existing_item:
             # Update quantity
             new_quantity = existing_item.quantity + cart_item.quantity
-            
-            if product.stock_quantity < new_quantity:
-                raise BadRequestException(
-                    f"Insufficient stock for {product.name}. Available: {product.stock_quantity}"
-                )
-            
-            existing_item.quantity = new_quantity
-            db.commit()
-            db.refresh(existing_item)
-            return existing_item
+            CartService._check_stock(db, user_id, product, new_quantity)
+            item = store.set_quantity(db, existing_item, new_quantity, product)
         else:
             # Create new cart item
-            new_cart_item = Cart(
-                user_id=user_id,
-                product_id=cart_item.product_id,
-                quantity=cart_item.quantity
-            )
-            db.add(new_cart_item)
-            db.commit()
-            db.refresh(new_cart_item)
-            return new_cart_item
+            CartService._check_stock(db, user_id, product, cart_item.quantity)
+            item = store.add_item(db, user_id, product, cart_item.quantity)
+        CartService._commit_cart_change(db, [product.id])
+        return item
     
     @staticmethod
-    def update_cart_item(db: Session, user_id: int, item_id: int, update_data: CartItemUpdate) -> Cart:
+    def update_cart_item(db: Session, user_id: int, item_id: int, update_data: CartItemUpdate):
         """Update cart item quantity."""
-        cart_item = db.query(Cart).filter(
-            Cart.id == item_id,
-            Cart.user_id == user_id
-        ).first()
+        return CartService._retry_hold_conflict(
+            db, lambda: CartService._update_cart_item(db, user_id, item_id, update_data)
+        )
+    
+    @staticmethod
+    def _update_cart_item(db: Session, user_id: int, item_id: int, update_data: CartItemUpdate):
+        store = get_cart_store()
+        cart_item = store.get_item(db, user_id, item_id)
         
         if not cart_item:
             raise NotFoundException("Cart item not found")
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            # Lock the product before the hold, as adds do, then read the line again
+            ReservationService.lock_product(db, cart_item.product_id)
+            db.expire_all()
+            cart_item = store.get_item(db, user_id, item_id)
+            if not cart_item:
+                raise NotFoundException("Cart item not found")
         
         # Verify stock availability
         product = ProductService.get_product_by_id(db, cart_item.product_id)
+        CartService._check_stock(db, user_id, product, update_data.quantity)
         
-        if product.stock_quantity < update_data.quantity:
-            raise BadRequestException(
-                f"Insufficient stock for {product.name}. Available: {product.stock_quantity}"
-            )
-        
-        cart_item.quantity = update_data.quantity
-        db.commit()
-        db.refresh(cart_item)
-        return cart_item
+        item = store.set_quantity(db, cart_item, update_data.quantity, product)
+        CartService._commit_cart_change(db, [product.id])
+        return item
     
     @staticmethod
     def remove_from_cart(db: Session, user_id: int, item_id: int) -> None:
         """Remove an item from the cart."""
-        cart_item = db.query(Cart).filter(
-            Cart.id == item_id,
-            Cart.user_id == user_id
-        ).first()
+        store = get_cart_store()
+        cart_item = store.get_item(db, user_id, item_id)
         
         if not cart_item:
             raise NotFoundException("Cart item not found")
         
-        db.delete(cart_item)
-        db.commit()
+        released = []
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            released = ReservationService.release(db, user_id, [cart_item.product_id], commit=False)
+        store.remove_item(db, cart_item)
+        CartService._commit_cart_change(db, released)
     
     @staticmethod
-    def clear_cart(db: Session, user_id: int) -> None:
-        """Clear all items from user's cart."""
-        db.query(Cart).filter(Cart.user_id == user_id).delete()
-        db.commit()
+    def clear_cart(db: Session, user_id: int, commit: bool = True) -> None:
+        """
+        Clear all items from user's cart. Stock holds are released, except at
+        checkout (commit=False), which converts them into the order.
+        """
+        released = []
+        if commit and settings.STOCK_RESERVATIONS_ENABLED:
+            released = ReservationService.release(db, user_id, commit=False)
+        get_cart_store().clear(db, user_id, commit=commit)
+        if commit:
+            CartService._commit_cart_change(db, released)
     
     @staticmethod
     def get_cart_total(db: Session, user_id: int) -> dict:
-        """Calculate cart total price and item count."""
-        cart_items = CartService.get_user_cart(db, user_id)
-        
-        total_price = 0.0
-        total_items = 0
-        
-        for item in cart_items:
-            if item.product:
-                total_price += item.product.price * item.quantity
-                total_items += item.quantity
-        
-        return {
-            "total_price": round(total_price, 2),
-            "total_items": total_items
-        }
+        """Calculate cart total price and item count (one aggregate query with the SQL store)."""
+        return get_cart_store().totals(db, user_id)
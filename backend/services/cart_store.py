@@ -0,0 +1,372 @@
+"""Cart storage backends.
+
+``CartService`` keeps the business rules (stock checks, not-found errors) and
+delegates storage to a ``CartStore``:
+
+- ``SqlCartStore`` (``CART_STORE=sql``, default) - every change is a
+  transaction against the ``cart`` table.
+- ``MemoryCartStore`` (``CART_STORE=memory``) - carts live in process memory
+  and changed carts are written behind to the ``cart`` table every
+  ``CART_FLUSH_INTERVAL_SECONDS``, at shutdown, and for checkout as part of
+  the order transaction. A cart is loaded from the table the first time its
+  user is seen. Carts are per process, so this backend needs a single worker
+  (or sticky sessions); a crash loses at most one flush interval of changes.
+"""
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, joinedload
+from backend.config import get_settings
+from backend.models.cart import Cart
+from backend.models.product import Product
+from backend.services.product_service import ProductService
+from backend.utils.fieldsets import FieldTree, load_options
+
+settings = get_settings()
+
+
+def cart_totals(items: Iterable[Any]) -> dict:
+    """Total item count and price of already loaded cart items."""
+    total_price = 0.0
+    total_items = 0
+    
+    for item in items:
+        if item.product:
+            total_price += item.product.price * item.quantity
+            total_items += item.quantity
+    
+    return {
+        "total_items": total_items,
+        "total_price": round(total_price, 2)
+    }
+
+
+class CartStore(ABC):
+    """Interface of a cart storage backend. Items expose Cart's attributes, product included."""
+
+    @abstractmethod
+    def list_items(self, db: Session, user_id: int, fields: Optional[FieldTree] = None) -> List[Any]:
+        """
+        Get all items in the user's cart, with their products. fields (a field
+        tree, see backend.utils.fieldsets) limits the columns read from the database.
+        """
+
+    @abstractmethod
+    def get_item(self, db: Session, user_id: int, item_id: int) -> Optional[Any]:
+        """Get one of the user's items by ID, or None."""
+
+    @abstractmethod
+    def find_item(self, db: Session, user_id: int, product_id: int) -> Optional[Any]:
+        """Get the user's item for a product, or None."""
+
+    @abstractmethod
+    def add_item(self, db: Session, user_id: int, product: Any, quantity: int) -> Any:
+        """Add a new line for product to the user's cart."""
+
+    @abstractmethod
+    def set_quantity(self, db: Session, item: Any, quantity: int, product: Any = None) -> Any:
+        """Change an item's quantity; product, if given, is attached to the returned item."""
+
+    @abstractmethod
+    def remove_item(self, db: Session, item: Any) -> None:
+        """Remove an item from its cart."""
+
+    @abstractmethod
+    def clear(self, db: Session, user_id: int, commit: bool = True) -> None:
+        """
+        Empty the user's cart. With commit=False the change becomes part of
+        the caller's transaction and only takes effect if it commits.
+        """
+
+    def totals(self, db: Session, user_id: int) -> dict:
+        """Get the cart's total item count and price."""
+        return cart_totals(self.list_items(db, user_id))
+
+    def stats(self) -> dict:
+        """Report backend activity counters."""
+        return {"backend": type(self).__name__}
+
+
+class SqlCartStore(CartStore):
+    """Cart lines stored as rows of the cart table, one transaction per change."""
+
+    def list_items(self, db: Session, user_id: int, fields: Optional[FieldTree] = None) -> List[Cart]:
+        options = load_options(Cart, fields) if fields is not None else [joinedload(Cart.product)]
+        return db.query(Cart).options(*options).filter(Cart.user_id == user_id).all()
+
+    def get_item(self, db: Session, user_id: int, item_id: int) -> Optional[Cart]:
+        return db.query(Cart).filter(Cart.id == item_id, Cart.user_id == user_id).first()
+
+    def find_item(self, db: Session, user_id: int, product_id: int) -> Optional[Cart]:
+        return db.query(Cart).filter(Cart.user_id == user_id, Cart.product_id == product_id).first()
+
+    def add_item(self, db: Session, user_id: int, product: Any, quantity: int) -> Cart:
+        item = Cart(user_id=user_id, product_id=product.id, quantity=quantity)
+        db.add(item)
+        db.commit()
+        db.refresh(item)
+        return item
+
+    def set_quantity(self, db: Session, item: Cart, quantity: int, product: Any = None) -> Cart:
+        item.quantity = quantity
+        db.commit()
+        db.refresh(item)
+        return item
+
+    def remove_item(self, db: Session, item: Cart) -> None:
+        db.delete(item)
+        db.commit()
+
+    def clear(self, db: Session, user_id: int, commit: bool = True) -> None:
+        db.query(Cart).filter(Cart.user_id == user_id).delete()
+        if commit:
+            db.commit()
+
+    def totals(self, db: Session, user_id: int) -> dict:
+        total_price, total_items = db.query(
+            func.sum(Product.price * Cart.quantity),
+            func.sum(Cart.quantity)
+        ).join(Product, Cart.product_id == Product.id).filter(Cart.user_id == user_id).one()
+
+        return {
+            "total_items": int(total_items or 0),
+            "total_price": round(total_price or 0.0, 2)
+        }
+
+
+@dataclass(frozen=True)
+class CartLine:
+    """A cart line held by MemoryCartStore; product is attached when read."""
+    id: int
+    user_id: int
+    product_id: int
+    quantity: int
+    added_at: datetime
+    product: Any = None
+
+
+def _utc_now() -> datetime:
+    # Naive UTC with whole seconds, like the cart table's server default
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class MemoryCartStore(CartStore):
+    """In-process carts with write-behind to the cart table."""
+
+    def __init__(self, flush_interval_seconds: float = 2.0, max_users: int = 100000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # user ID -> {item ID: line}, least recently used first; line dicts are replaced, never mutated
+        self._carts: "OrderedDict[int, Dict[int, CartLine]]" = OrderedDict()
+        self._dirty: set = set()
+        self._next_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.loads = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.flush_errors = 0
+        self.evictions = 0
+
+    # ----- In-memory state -----
+
+    def _lines(self, db: Session, user_id: int) -> Dict[int, CartLine]:
+        """Get the user's lines, loading the cart from the table the first time."""
+        with self._lock:
+            lines = self._carts.get(user_id)
+            if lines is not None:
+                self._carts.move_to_end(user_id)
+                return lines
+
+        rows = db.query(Cart).filter(Cart.user_id == user_id).all()
+        loaded = {
+            row.id: CartLine(row.id, row.user_id, row.product_id, row.quantity, row.added_at)
+            for row in rows
+        }
+        with self._lock:
+            # Another request may have loaded (and changed) the cart meanwhile
+            lines = self._carts.setdefault(user_id, loaded)
+            self._carts.move_to_end(user_id)
+            self.loads += 1
+            self._evict()
+            return lines
+
+    def _evict(self) -> None:
+        """Drop least recently used carts that have been flushed, down to max_users."""
+        excess = len(self._carts) - self.max_users
+        if excess <= 0:
+            return
+        for user_id in list(self._carts):
+            if excess <= 0:
+                break
+            if user_id not in self._dirty:
+                del self._carts[user_id]
+                self.evictions += 1
+                excess -= 1
+
+    def _modify(self, db: Session, user_id: int, change: Callable[[Dict[int, CartLine]], None]) -> None:
+        """Apply change to a copy of the user's lines and mark the cart for flushing."""
+        loaded = self._lines(db, user_id)
+        with self._lock:
+            lines = dict(self._carts.get(user_id, loaded))
+            change(lines)
+            self._carts[user_id] = lines
+            self._carts.move_to_end(user_id)
+            self._dirty.add(user_id)
+
+    def _allocate_id(self, db: Session) -> int:
+        """Item IDs continue the cart table's sequence, so flushed rows keep them."""
+        if self._next_id is None:
+            max_id = db.query(func.max(Cart.id)).scalar() or 0
+            with self._lock:
+                if self._next_id is None:
+                    self._next_id = max_id + 1
+        with self._lock:
+            item_id = self._next_id
+            self._next_id += 1
+            return item_id
+
+    @staticmethod
+    def _with_products(db: Session, lines: List[CartLine]) -> List[CartLine]:
+        """Attach current products to lines with one lookup (free with the catalog replica)."""
+        products = {
+            product.id: product
+            for product in ProductService._get_products_by_ids(db, [line.product_id for line in lines])
+        }
+        return [replace(line, product=products.get(line.product_id)) for line in lines]
+
+    # ----- CartStore -----
+
+    def list_items(self, db: Session, user_id: int, fields: Optional[FieldTree] = None) -> List[CartLine]:
+        # Lines are in memory and their products come from one lookup; fields changes nothing here
+        lines = sorted(self._lines(db, user_id).values(), key=lambda line: line.id)
+        return self._with_products(db, lines)
+
+    def get_item(self, db: Session, user_id: int, item_id: int) -> Optional[CartLine]:
+        return self._lines(db, user_id).get(item_id)
+
+    def find_item(self, db: Session, user_id: int, product_id: int) -> Optional[CartLine]:
+        return next(
+            (line for line in self._lines(db, user_id).values() if line.product_id == product_id),
+            None
+        )
+
+    def add_item(self, db: Session, user_id: int, product: Any, quantity: int) -> CartLine:
+        line = CartLine(self._allocate_id(db), user_id, product.id, quantity, _utc_now())
+        self._modify(db, user_id, lambda lines: lines.__setitem__(line.id, line))
+        return replace(line, product=product)
+
+    def set_quantity(self, db: Session, item: CartLine, quantity: int, product: Any = None) -> CartLine:
+        def change(lines):
+            if item.id in lines:
+                lines[item.id] = replace(lines[item.id], quantity=quantity)
+
+        self._modify(db, item.user_id, change)
+        return replace(item, quantity=quantity, product=product)
+
+    def remove_item(self, db: Session, item: CartLine) -> None:
+        self._modify(db, item.user_id, lambda lines: lines.pop(item.id, None))
+
+    def clear(self, db: Session, user_id: int, commit: bool = True) -> None:
+        if commit:
+            self._modify(db, user_id, lambda lines: lines.clear())
+            return
+        # Checkout: delete any flushed rows in the order's transaction and only
+        # empty the in-memory cart once that transaction commits
+        db.query(Cart).filter(Cart.user_id == user_id).delete()
+        event.listen(db, "after_commit", lambda session: self._modify(session, user_id, lambda lines: lines.clear()), once=True)
+
+    # ----- Write-behind -----
+
+    def flush(self, db: Session) -> int:
+        """Write every changed cart to the cart table; returns the number of carts written."""
+        with self._flush_lock:
+            with self._lock:
+                dirty = {user_id: self._carts.get(user_id, {}) for user_id in self._dirty}
+                self._dirty.clear()
+            if not dirty:
+                return 0
+            try:
+                db.query(Cart).filter(Cart.user_id.in_(list(dirty))).delete(synchronize_session=False)
+                rows = [
+                    {
+                        "id": line.id, "user_id": line.user_id, "product_id": line.product_id,
+                        "quantity": line.quantity, "added_at": line.added_at,
+                    }
+                    for lines in dirty.values() for line in lines.values()
+                ]
+                if rows:
+                    db.execute(Cart.__table__.insert(), rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._dirty.update(dirty)
+                    self.flush_errors += 1
+                raise
+            with self._lock:
+                self.flushes += 1
+                self.rows_flushed += len(rows)
+            return len(dirty)
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Start the background flusher (no-op if the flush interval is 0)."""
+        if self._thread is not None or self.flush_interval_seconds <= 0:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.flush_interval_seconds):
+                db = session_factory()
+                try:
+                    self.flush(db)
+                except Exception as exc:
+                    print(f"Cart flush failed, will retry: {exc}")
+                finally:
+                    db.close()
+
+        self._thread = threading.Thread(target=run, name="cart-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, session_factory: Callable[[], Session]) -> None:
+        """Stop the background flusher and write any remaining changes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        db = session_factory()
+        try:
+            self.flush(db)
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "carts": len(self._carts),
+            "dirty": len(self._dirty),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "flush_errors": self.flush_errors,
+            "flush_interval_seconds": self.flush_interval_seconds,
+        }
+
+
+sql_cart_store = SqlCartStore()
+memory_cart_store = MemoryCartStore(
+    flush_interval_seconds=settings.CART_FLUSH_INTERVAL_SECONDS,
+    max_users=settings.CART_STORE_MAX_USERS
+)
+
+
+def get_cart_store() -> CartStore:
+    """The cart store selected by CART_STORE."""
+    return memory_cart_store if settings.CART_STORE == "memory" else sql_cart_store
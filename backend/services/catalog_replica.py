@@ -0,0 +1,229 @@
+"""In-process read replica of the products table.
+
+The catalog is small and read-heavy, so when enabled the whole ``products``
+table is mirrored into memory at startup. Browse and product-detail reads are
+answered from the replica, while ``ProductService`` pushes every write through
+the invalidation hooks below so the replica stays current. A periodic full
+reload (``CATALOG_REPLICA_TTL_SECONDS``) picks up writes made by other worker
+processes.
+"""
+import threading
+import time
+from bisect import bisect_right
+from itertools import islice
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.product import Product
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class ProductSnapshot:
+    """Immutable copy of a product row held by the replica."""
+    id: int
+    name: str
+    description: Optional[str]
+    price: float
+    category: str
+    stock_quantity: int
+    reserved_quantity: int
+    image_url: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    version: int
+
+    @classmethod
+    def from_product(cls, product: Product) -> "ProductSnapshot":
+        """Build a snapshot from a product ORM instance."""
+        return cls(
+            id=product.id,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            category=product.category,
+            stock_quantity=product.stock_quantity,
+            reserved_quantity=product.reserved_quantity,
+            image_url=product.image_url,
+            created_at=product.created_at,
+            updated_at=product.updated_at,
+            version=product.version,
+        )
+
+    @property
+    def available_quantity(self) -> int:
+        """Stock not held for carts, as Product.available_quantity."""
+        return self.stock_quantity - self.reserved_quantity
+
+    def to_dict(self):
+        """Convert snapshot to dictionary."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "category": self.category,
+            "stock_quantity": self.stock_quantity,
+            "image_url": self.image_url,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class CatalogReplica:
+    """Thread-safe in-memory mirror of the products table."""
+
+    def __init__(self, ttl_seconds: int = 60):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._products: Dict[int, ProductSnapshot] = {}
+        self._ids: List[int] = []
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.invalidations = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the replica currently holds a usable copy of the catalog."""
+        return self._loaded
+
+    def is_stale(self) -> bool:
+        """Whether the replica is past its refresh interval."""
+        return not self._loaded or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def load(self, db: Session) -> None:
+        """(Re)load the full catalog from the database."""
+        products = db.query(Product).order_by(Product.id).all()
+        snapshots = {p.id: ProductSnapshot.from_product(p) for p in products}
+        with self._lock:
+            self._products = snapshots
+            self._ids = list(snapshots)
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Reload the catalog if it has not been loaded or has expired."""
+        if self.is_stale():
+            self.load(db)
+
+    def clear(self) -> None:
+        """Drop the replica; reads fall back to the database until reloaded."""
+        with self._lock:
+            self._products = {}
+            self._ids = []
+            self._loaded = False
+
+    # ----- Reads -----
+
+    def get(self, product_id: int) -> Optional[ProductSnapshot]:
+        """Get a product snapshot by ID, or None if not present."""
+        product = self._products.get(product_id)
+        if product is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return product
+
+    def list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        after_id: Optional[int] = None
+    ) -> List[ProductSnapshot]:
+        """Filter and paginate the catalog in memory, ordered by ID."""
+        self.hits += 1
+        by_id, ids = self._products, self._ids
+        start = bisect_right(ids, after_id) if after_id is not None else 0
+        # A concurrent insert/remove may swap the dict and ID list between the two
+        # reads above, so tolerate IDs that are missing from the dict
+        products = (p for p in map(by_id.get, islice(ids, start, None)) if p is not None)
+
+        if category:
+            products = (p for p in products if p.category == category)
+
+        if search:
+            term = search.lower()
+            products = (
+                p for p in products
+                if term in p.name.lower() or (p.description and term in p.description.lower())
+            )
+
+        return list(islice(products, skip, skip + limit))
+
+    # ----- Invalidation hooks -----
+
+    def upsert(self, product: Product) -> None:
+        """Insert or replace a product after it was created or updated."""
+        if not self._loaded:
+            return
+        snapshot = ProductSnapshot.from_product(product)
+        with self._lock:
+            if snapshot.id in self._products:
+                # Same key set: replace in place, readers never see a resize
+                self._products[snapshot.id] = snapshot
+            else:
+                # Copy on insert so concurrent readers keep iterating safely
+                products = dict(self._products)
+                out_of_order = bool(products) and snapshot.id < next(reversed(products))
+                products[snapshot.id] = snapshot
+                if out_of_order:
+                    products = dict(sorted(products.items()))
+                self._products = products
+                self._ids = list(products)
+            self.invalidations += 1
+
+    def remove(self, product_id: int) -> None:
+        """Drop a product after it was deleted."""
+        if not self._loaded:
+            return
+        with self._lock:
+            products = dict(self._products)
+            products.pop(product_id, None)
+            self._products = products
+            self._ids = list(products)
+            self.invalidations += 1
+
+    def adjust_stock(self, product_id: int, delta: int) -> None:
+        """Apply a stock change made by a set-based update."""
+        if not self._loaded:
+            return
+        with self._lock:
+            current = self._products.get(product_id)
+            if current is None:
+                return
+            self._products[product_id] = replace(
+                current,
+                stock_quantity=current.stock_quantity + delta,
+                updated_at=datetime.now(timezone.utc),
+                # The set-based update incremented the row's version once
+                version=current.version + 1
+            )
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Report hit/miss and staleness counters."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.CATALOG_REPLICA_ENABLED,
+            "loaded": self._loaded,
+            "products": len(self._products),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+            "invalidations": self.invalidations,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 3) if self._loaded else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+catalog_replica = CatalogReplica(ttl_seconds=settings.CATALOG_REPLICA_TTL_SECONDS)
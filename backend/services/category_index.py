@@ -0,0 +1,135 @@
+"""In-memory index of product categories with product and in-stock counts.
+
+Built with one GROUP BY at startup and then maintained incrementally by
+``ProductService`` as products are created, updated, deleted or sell out, so
+``/api/products/categories`` is answered in O(#categories) instead of a
+``SELECT DISTINCT`` over the whole table. A periodic rebuild
+(``CATEGORY_INDEX_TTL_SECONDS``) picks up writes made by other worker
+processes.
+
+``version()`` identifies the current counts for the categories ETag. It is a
+digest of the counts themselves, recomputed on every change, so worker
+processes holding the same counts send the same ETag.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.product import Product
+
+settings = get_settings()
+
+# (category, in stock) of a product before or after a change
+ProductKey = Optional[Tuple[str, bool]]
+
+
+def _digest(counts: Dict[str, Tuple[int, int]]) -> str:
+    return hashlib.sha1(repr(sorted(counts.items())).encode()).hexdigest()[:20]
+
+
+class CategoryIndex:
+    """Thread-safe per-category product and in-stock counters."""
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # category -> (product count, in-stock count); replaced, never mutated
+        self._counts: Dict[str, Tuple[int, int]] = {}
+        self._version = _digest(self._counts)
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.reloads = 0
+        self.updates = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been built."""
+        return self._loaded
+
+    def is_stale(self) -> bool:
+        """Whether the index is past its rebuild interval."""
+        return not self._loaded or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def load(self, db: Session) -> None:
+        """(Re)build the counters from the products table."""
+        rows = db.query(
+            Product.category,
+            func.count(Product.id),
+            func.sum(case((Product.stock_quantity > 0, 1), else_=0))
+        ).group_by(Product.category).all()
+        counts = {category: (total, int(in_stock or 0)) for category, total, in_stock in rows}
+        with self._lock:
+            self._counts = counts
+            self._version = _digest(counts)
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Rebuild the index if it has not been built or has expired."""
+        if self.is_stale():
+            self.load(db)
+
+    # ----- Reads -----
+
+    def version(self) -> str:
+        """Identify the current counts; changes whenever a category or count does."""
+        return self._version
+
+    def categories(self) -> List[str]:
+        """Get all categories that have at least one product, sorted."""
+        return sorted(self._counts)
+
+    def counts(self) -> List[dict]:
+        """Get every category with its product and in-stock counts, sorted by category."""
+        return [
+            {"category": category, "product_count": total, "in_stock_count": in_stock}
+            for category, (total, in_stock) in sorted(self._counts.items())
+        ]
+
+    # ----- Incremental updates -----
+
+    def product_changed(self, before: ProductKey, after: ProductKey) -> None:
+        """
+        Apply a product change given its (category, in stock) before and after;
+        None for before/after means the product was created/deleted.
+        """
+        if not self._loaded or before == after:
+            return
+        with self._lock:
+            counts = dict(self._counts)
+            for key, sign in ((before, -1), (after, 1)):
+                if key is None:
+                    continue
+                category, in_stock = key
+                total, stocked = counts.get(category, (0, 0))
+                total, stocked = total + sign, stocked + (sign if in_stock else 0)
+                if total > 0:
+                    counts[category] = (total, max(stocked, 0))
+                else:
+                    counts.pop(category, None)
+            self._counts = counts
+            self._version = _digest(counts)
+            self.updates += 1
+
+    def products_sold_out(self, categories: List[str]) -> None:
+        """Record products (given by category) whose stock dropped to zero."""
+        for category in categories:
+            self.product_changed((category, True), (category, False))
+
+    def stats(self) -> dict:
+        """Report index size and activity counters."""
+        return {
+            "loaded": self._loaded,
+            "categories": len(self._counts),
+            "updates": self.updates,
+            "reloads": self.reloads,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 3) if self._loaded else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+category_index = CategoryIndex(ttl_seconds=settings.CATEGORY_INDEX_TTL_SECONDS)
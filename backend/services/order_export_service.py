@@ -0,0 +1,114 @@
+"""Streaming order export (CSV / NDJSON) for finance reconciliation."""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.order import Order, OrderItem, OrderStatus
+from backend.models.product import Product
+from backend.services.order_service import OrderService
+from backend.utils.exceptions import BadRequestException
+from backend.utils.streaming import EXPORT_CHUNK_BYTES, export_value
+
+settings = get_settings()
+
+FORMATS = ("csv", "ndjson")
+ORDER_COLUMNS = (
+    "order_id", "user_id", "status", "total_amount", "created_at", "updated_at", "shipping_address", "payment_method"
+)
+ITEM_COLUMNS = ("item_id", "product_id", "product_name", "quantity", "price_at_purchase")
+# CSV output has one row per order item, with the order's columns repeated
+CSV_COLUMNS = ORDER_COLUMNS + ITEM_COLUMNS
+
+
+class OrderExportService:
+    """Service class for streaming order exports."""
+
+    @staticmethod
+    def _query(status: Optional[OrderStatus], created_from: Optional[datetime], created_to: Optional[datetime]):
+        """
+        Orders joined to their items and product names, one row per item, in
+        order ID order. Items are not sorted within an order: a secondary sort
+        key makes the database sort the whole result before returning the
+        first row, which would defeat streaming.
+        """
+        query = select(
+            Order.id.label("order_id"), Order.user_id, Order.status, Order.total_amount, Order.created_at,
+            Order.updated_at, Order.shipping_address, Order.payment_method,
+            OrderItem.id.label("item_id"), OrderItem.product_id, Product.name.label("product_name"),
+            OrderItem.quantity, OrderItem.price_at_purchase
+        ).outerjoin(OrderItem, OrderItem.order_id == Order.id).outerjoin(Product, Product.id == OrderItem.product_id)
+
+        return query.where(*OrderService._filter_conditions(status, created_from, created_to)).order_by(Order.id)
+
+    @staticmethod
+    def export_orders(
+        session_factory: Callable[[], Session],
+        fmt: str = "csv",
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream orders with their items as CSV (one row per item) or NDJSON (one
+        object per order with an items list), optionally filtered by status and
+        by created_at (created_from inclusive, created_to exclusive).
+        One joined query is read through a server-side cursor and output is
+        yielded every EXPORT_CHUNK_BYTES, so memory stays bounded and the
+        download starts before the query has finished. The generator opens and
+        closes its own session, as it outlives the request's.
+        """
+        if fmt not in FORMATS:
+            raise BadRequestException(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+        batch_size = batch_size or settings.BULK_BATCH_SIZE
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(CSV_COLUMNS)
+            # Send the header straight away so the client sees the download start
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        db = session_factory()
+        try:
+            result = db.execute(
+                OrderExportService._query(status, created_from, created_to)
+                .execution_options(stream_results=True, yield_per=batch_size)
+            )
+            current = None  # NDJSON order being assembled; rows of one order are adjacent
+            for row in result:
+                if fmt == "csv":
+                    writer.writerow([export_value(value) for value in row])
+                else:
+                    if current is None or current["id"] != row.order_id:
+                        if current is not None:
+                            buffer.write(json.dumps(current, ensure_ascii=False))
+                            buffer.write("\n")
+                        current = {
+                            "id" if name == "order_id" else name: export_value(getattr(row, name))
+                            for name in ORDER_COLUMNS
+                        }
+                        current["items"] = []
+                    if row.item_id is not None:
+                        current["items"].append({
+                            "id" if name == "item_id" else name: getattr(row, name) for name in ITEM_COLUMNS
+                        })
+
+                if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            if current is not None:
+                buffer.write(json.dumps(current, ensure_ascii=False))
+                buffer.write("\n")
+            if buffer.tell():
+                yield buffer.getvalue().encode("utf-8")
+        finally:
+            db.close()
@@ -1,12 +1,40 @@
 """Order service containing business logic for order operations."""
-from sqlalchemy.orm import Session
-from typing import List
+import time
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session, Query, selectinload
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
 from backend.models.order import Order, OrderItem, OrderStatus
 from backend.models.cart import Cart
-from backend.schemas import OrderCreate, OrderStatusUpdate
+from backend.config import get_settings
+from backend.schemas import OrderCreate, OrderStatusUpdate, OrderBulkStatusUpdate
 from backend.utils.exceptions import NotFoundException, BadRequestException
+from backend.utils.fieldsets import FieldTree, load_options, merge_fields
 from backend.services.cart_service import CartService
 from backend.services.product_service import ProductService
+from backend.services.reservation_service import ReservationService
+
+settings = get_settings()
+
+# Statuses an order may move to from each status, enforced by single and bulk status changes.
+# Orders are created pending and nothing confirms them on its own, so pending may ship directly.
+ORDER_STATUS_TRANSITIONS: Dict[OrderStatus, Tuple[OrderStatus, ...]] = {
+    OrderStatus.PENDING: (OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.CANCELLED),
+    OrderStatus.CONFIRMED: (OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.CANCELLED),
+    OrderStatus.PROCESSING: (OrderStatus.SHIPPED, OrderStatus.CANCELLED),
+    OrderStatus.SHIPPED: (OrderStatus.DELIVERED,),
+    OrderStatus.DELIVERED: (),
+    OrderStatus.CANCELLED: (),
+}
+# Rejected order IDs listed in a bulk status report; the rest are only counted
+MAX_REJECTED_IDS = 100
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC, so compare filter bounds the same way
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class OrderService:
@@ -21,9 +49,10 @@ class OrderService:
         if not cart_items:
             raise BadRequestException("Cart is empty. Cannot create order.")
         
-        # Calculate total and verify stock availability
+        # Calculate total
         total_amount = 0.0
         order_items_data = []
+        quantities = {}
         
         for cart_item in cart_items:
             product = cart_item.product
@@ -31,11 +60,7 @@ class OrderService:
             if not product:
                 raise NotFoundException(f"Product with ID {cart_item.product_id} not found")
             
-            # Check stock availability
-            if not ProductService.check_stock_availability(db, product.id, cart_item.quantity):
-                raise BadRequestException(
-                    f"Insufficient stock for {product.name}. Available: {product.stock_quantity}"
-                )
+            quantities[product.id] = quantities.get(product.id, 0) + cart_item.quantity
             
             # Calculate item total
             item_total = product.price * cart_item.quantity
@@ -48,6 +73,13 @@ class OrderService:
                 "price_at_purchase": product.price
             })
         
+        # Take stock for every line item in one conditional UPDATE (or convert the
+        # cart's holds); raises (and rolls back) if any product is short
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            sold_out = ReservationService.checkout(db, user_id, quantities)
+        else:
+            sold_out = ProductService.decrement_stock(db, quantities)
+        
         # Create order
         order = Order(
             user_id=user_id,
@@ -58,34 +90,62 @@ class OrderService:
         )
         db.add(order)
         db.flush()  # Get order ID without committing
+        order_id = order.id
         
-        # Create order items and reduce stock
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=order.id,
-                **item_data
-            )
-            db.add(order_item)
-            
-            # Reduce product stock
-            ProductService.reduce_stock(db, item_data["product_id"], item_data["quantity"])
+        # Create order items
+        db.add_all(OrderItem(order_id=order_id, **item_data) for item_data in order_items_data)
         
         # Clear cart after successful order
-        CartService.clear_cart(db, user_id)
+        CartService.clear_cart(db, user_id, commit=False)
         
         db.commit()
-        db.refresh(order)
-        return order
+        ProductService.notify_stock_decremented(quantities, sold_out)
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            # Checkout also consumed the holds: re-read reserved_quantity with the stock
+            ProductService.refresh_replica(db, list(quantities))
+        return OrderService.get_order_by_id(db, order_id)
+    
+    @staticmethod
+    def _with_items(query: Query, fields: Optional[FieldTree] = None) -> Query:
+        """
+        Eager-load line items and their products (two extra queries per page, not per order).
+        With fields (a field tree, see backend.utils.fieldsets), load only those
+        columns and relationships, plus created_at for the page cursor.
+        """
+        if fields is not None:
+            return query.options(
+                *load_options(Order, merge_fields(fields, {"created_at": None}), aliases={"items": "order_items"})
+            )
+        return query.options(selectinload(Order.order_items).selectinload(OrderItem.product))
     
     @staticmethod
-    def get_user_orders(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Order]:
-        """Get all orders for a user."""
-        return db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    def _newest_first(query: Query, before: Optional[Tuple[datetime, int]] = None) -> Query:
+        """Order newest first, continuing after a (created_at, id) keyset position."""
+        if before is not None:
+            created_at, order_id = before
+            query = query.filter(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.id < order_id)
+            ))
+        return query.order_by(Order.created_at.desc(), Order.id.desc())
+    
+    @staticmethod
+    def get_user_orders(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        before: Optional[Tuple[datetime, int]] = None,
+        fields: Optional[FieldTree] = None
+    ) -> List[Order]:
+        """Get all orders for a user, newest first (only fields, if given)."""
+        query = OrderService._with_items(db.query(Order).filter(Order.user_id == user_id), fields)
+        return OrderService._newest_first(query, before).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_order_by_id(db: Session, order_id: int, user_id: int = None) -> Order:
         """Get an order by ID."""
-        query = db.query(Order).filter(Order.id == order_id)
+        query = OrderService._with_items(db.query(Order).filter(Order.id == order_id))
         
         # If user_id is provided, ensure order belongs to user
         if user_id is not None:
@@ -100,20 +160,129 @@ class OrderService:
     
     @staticmethod
     def update_order_status(db: Session, order_id: int, status_update: OrderStatusUpdate) -> Order:
-        """Update order status (admin only)."""
+        """Update order status (admin only); only ORDER_STATUS_TRANSITIONS are allowed."""
         order = OrderService.get_order_by_id(db, order_id)
         
+        if order.status == status_update.status:
+            return order
+        if status_update.status not in ORDER_STATUS_TRANSITIONS[order.status]:
+            raise BadRequestException(
+                f"Cannot change order status from {order.status.value} to {status_update.status.value}"
+            )
+        
         order.status = status_update.status
         db.commit()
-        db.refresh(order)
-        return order
+        return OrderService.get_order_by_id(db, order_id)
+    
+    @staticmethod
+    def _filter_conditions(
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> list:
+        """WHERE conditions selecting orders by status and created_at (from inclusive, to exclusive)."""
+        conditions = []
+        if status:
+            conditions.append(Order.status == status)
+        if created_from:
+            conditions.append(Order.created_at >= _naive_utc(created_from))
+        if created_to:
+            conditions.append(Order.created_at < _naive_utc(created_to))
+        return conditions
+    
+    @staticmethod
+    def _id_batches(db: Session, bulk_update: OrderBulkStatusUpdate, batch_size: int) -> Iterator[List[int]]:
+        """Yield the selected order IDs in ascending batches (keyset-paged for a filter)."""
+        if bulk_update.order_ids is not None:
+            order_ids = sorted(set(bulk_update.order_ids))
+            for start in range(0, len(order_ids), batch_size):
+                yield order_ids[start:start + batch_size]
+            return
+        
+        conditions = OrderService._filter_conditions(
+            bulk_update.filter.status, bulk_update.filter.created_from, bulk_update.filter.created_to
+        )
+        last_id = 0
+        while True:
+            order_ids = [
+                order_id for order_id, in db.query(Order.id).filter(*conditions, Order.id > last_id)
+                .order_by(Order.id).limit(batch_size)
+            ]
+            if not order_ids:
+                return
+            yield order_ids
+            last_id = order_ids[-1]
+    
+    @staticmethod
+    def bulk_update_status(db: Session, bulk_update: OrderBulkStatusUpdate, batch_size: Optional[int] = None) -> dict:
+        """
+        Move the selected orders to a new status (admin only), given by ID or by
+        filter, in batches of batch_size orders each committed on its own.
+        Transitions are validated in the UPDATE itself: each batch is one
+        statement that only changes orders whose current status may move to the
+        target (ORDER_STATUS_TRANSITIONS), followed by one grouped count that
+        classifies the rest. Returns counts of updated, unchanged (already at
+        the target) and rejected orders, with the first rejected IDs.
+        """
+        if (bulk_update.order_ids is None) == (bulk_update.filter is None):
+            raise BadRequestException("Give either order_ids or filter")
+        if bulk_update.filter is not None and not bulk_update.filter.model_dump(exclude_none=True):
+            raise BadRequestException("filter needs at least one condition")
+        batch_size = batch_size or settings.BULK_BATCH_SIZE
+        
+        target = bulk_update.status
+        sources = [status for status, targets in ORDER_STATUS_TRANSITIONS.items() if target in targets]
+        report = {"status": target.value, "matched": 0, "updated": 0, "unchanged": 0, "rejected": 0,
+                  "not_found": 0, "rejected_by_status": {}, "rejected_ids": [], "batches": 0}
+        start = time.perf_counter()
+        
+        for order_ids in OrderService._id_batches(db, bulk_update, batch_size):
+            updated = 0
+            if sources:
+                updated = db.execute(
+                    update(Order)
+                    .where(Order.id.in_(order_ids), Order.status.in_(sources))
+                    .values(status=target)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+            counts = dict(
+                db.query(Order.status, func.count(Order.id)).filter(Order.id.in_(order_ids)).group_by(Order.status)
+            )
+            rejected = {status: count for status, count in counts.items() if status != target}
+            if rejected and len(report["rejected_ids"]) < MAX_REJECTED_IDS:
+                report["rejected_ids"].extend(
+                    order_id for order_id, in db.query(Order.id)
+                    .filter(Order.id.in_(order_ids), Order.status != target)
+                    .order_by(Order.id).limit(MAX_REJECTED_IDS - len(report["rejected_ids"]))
+                )
+            db.commit()
+            
+            matched = sum(counts.values())
+            report["batches"] += 1
+            report["matched"] += matched
+            report["updated"] += updated
+            report["unchanged"] += counts.get(target, 0) - updated
+            report["not_found"] += len(order_ids) - matched
+            for status, count in rejected.items():
+                report["rejected_by_status"][status.value] = report["rejected_by_status"].get(status.value, 0) + count
+        
+        report["rejected"] = sum(report["rejected_by_status"].values()) + report["not_found"]
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return report
     
     @staticmethod
-    def get_all_orders(db: Session, skip: int = 0, limit: int = 100, status: OrderStatus = None) -> List[Order]:
-        """Get all orders (admin only) with optional status filter."""
-        query = db.query(Order).order_by(Order.created_at.desc())
+    def get_all_orders(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        status: OrderStatus = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        fields: Optional[FieldTree] = None
+    ) -> List[Order]:
+        """Get all orders (admin only) with optional status filter, newest first (only fields, if given)."""
+        query = OrderService._with_items(db.query(Order), fields)
         
         if status:
             query = query.filter(Order.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        return OrderService._newest_first(query, before).offset(skip).limit(limit).all()
@@ -1,25 +1,61 @@
 """Product service containing business logic for product operations."""
+from sqlalchemy import case, update
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from backend.models.product import Product
 from backend.schemas import ProductCreate, ProductUpdate
-from backend.utils.exceptions import NotFoundException, BadRequestException
+from backend.config import get_settings
+from backend.services.catalog_replica import catalog_replica
+from backend.services.category_index import category_index
+from backend.services.search_index import product_search_index, parse_query
+from backend.utils.exceptions import NotFoundException, InsufficientStockException
+from backend.utils.fieldsets import FieldTree, load_options, merge_fields
 from backend.utils.validators import validate_positive_number, validate_non_negative_integer
 
+settings = get_settings()
+
 
 class ProductService:
     """Service class for product operations."""
     
+    @staticmethod
+    def _use_replica(db: Session) -> bool:
+        """Check whether reads can be served from the catalog replica."""
+        if not settings.CATALOG_REPLICA_ENABLED:
+            return False
+        catalog_replica.ensure_fresh(db)
+        return True
+    
     @staticmethod
     def get_all_products(
         db: Session,
         skip: int = 0,
         limit: int = 100,
         category: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        after_id: Optional[int] = None,
+        fields: Optional[FieldTree] = None
     ) -> List[Product]:
-        """Get all products with optional filtering and pagination."""
+        """
+        Get all products with optional filtering and pagination.
+        Products are ordered by ID; pass after_id (keyset) instead of skip to page
+        without scanning the skipped rows. Ranked searches (see is_ranked_search)
+        are ordered by relevance and paged with skip.
+        With fields (a field tree, see backend.utils.fieldsets), only those
+        columns are loaded from the database, plus the version for the ETag.
+        """
+        if ProductService.is_ranked_search(search):
+            return ProductService._search_products(db, search, skip=skip, limit=limit, category=category)
+        
+        if ProductService._use_replica(db):
+            return catalog_replica.list(
+                skip=skip, limit=limit, category=category, search=search, after_id=after_id
+            )
+        
         query = db.query(Product)
+        if fields is not None:
+            query = query.options(*load_options(Product, merge_fields(fields, {"version": None})))
         
         # Filter by category if provided
         if category:
@@ -33,11 +69,71 @@ class ProductService:
                 (Product.description.ilike(search_pattern))
             )
         
-        return query.offset(skip).limit(limit).all()
+        if after_id is not None:
+            query = query.filter(Product.id > after_id)
+        
+        return query.order_by(Product.id).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def is_ranked_search(search: Optional[str]) -> bool:
+        """Check whether a search is served by a relevance-ranked backend."""
+        return bool(search) and settings.SEARCH_BACKEND in ("index", "fulltext")
+    
+    @staticmethod
+    def _search_products(
+        db: Session,
+        search: str,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None
+    ) -> List[Product]:
+        """Full-text product search, best match first."""
+        if settings.SEARCH_BACKEND == "fulltext":
+            terms, match_all = parse_query(search)
+            if not terms:
+                return []
+            # Prefix-match every term; "+" makes a term required
+            boolean_query = " ".join(f"{'+' if match_all else ''}{term}*" for term in terms)
+            relevance = match(
+                Product.name, Product.description, Product.category, against=boolean_query
+            ).in_boolean_mode()
+            
+            query = db.query(Product).filter(relevance)
+            if category:
+                query = query.filter(Product.category == category)
+            return query.order_by(relevance.desc(), Product.id).offset(skip).limit(limit).all()
+        
+        product_search_index.ensure_fresh(db)
+        product_ids = product_search_index.search(search, category=category, limit=skip + limit)[skip:]
+        return ProductService._get_products_by_ids(db, product_ids)
+    
+    @staticmethod
+    def _get_products_by_ids(db: Session, product_ids: List[int]) -> List[Product]:
+        """Fetch products by ID, preserving the order of the given IDs."""
+        if not product_ids:
+            return []
+        
+        if ProductService._use_replica(db):
+            products = {product_id: catalog_replica.get(product_id) for product_id in product_ids}
+        else:
+            products = {
+                product.id: product
+                for product in db.query(Product).filter(Product.id.in_(product_ids)).all()
+            }
+        return [products[product_id] for product_id in product_ids if products.get(product_id)]
     
     @staticmethod
     def get_product_by_id(db: Session, product_id: int) -> Product:
         """Get a product by ID."""
+        if ProductService._use_replica(db):
+            product = catalog_replica.get(product_id)
+            if product:
+                return product
+        return ProductService._get_product_row(db, product_id)
+    
+    @staticmethod
+    def _get_product_row(db: Session, product_id: int) -> Product:
+        """Get a product by ID from the database, for callers that modify it."""
         product = db.query(Product).filter(Product.id == product_id).first()
         if not product:
             raise NotFoundException(f"Product with ID {product_id} not found")
@@ -55,12 +151,16 @@ class ProductService:
         db.add(product)
         db.commit()
         db.refresh(product)
+        catalog_replica.upsert(product)
+        product_search_index.index_product(product)
+        category_index.product_changed(None, (product.category, product.stock_quantity > 0))
         return product
     
     @staticmethod
     def update_product(db: Session, product_id: int, product_data: ProductUpdate) -> Product:
         """Update an existing product."""
-        product = ProductService.get_product_by_id(db, product_id)
+        product = ProductService._get_product_row(db, product_id)
+        before = (product.category, product.stock_quantity > 0)
         
         # Update only provided fields
         update_data = product_data.model_dump(exclude_unset=True)
@@ -78,20 +178,38 @@ class ProductService:
         
         db.commit()
         db.refresh(product)
+        catalog_replica.upsert(product)
+        product_search_index.index_product(product)
+        category_index.product_changed(before, (product.category, product.stock_quantity > 0))
         return product
     
     @staticmethod
     def delete_product(db: Session, product_id: int) -> None:
         """Delete a product."""
-        product = ProductService.get_product_by_id(db, product_id)
+        product = ProductService._get_product_row(db, product_id)
+        before = (product.category, product.stock_quantity > 0)
         db.delete(product)
         db.commit()
+        catalog_replica.remove(product_id)
+        product_search_index.remove_product(product_id)
+        category_index.product_changed(before, None)
     
     @staticmethod
-    def get_categories(db: Session) -> List[str]:
-        """Get all unique product categories."""
-        categories = db.query(Product.category).distinct().all()
-        return [cat[0] for cat in categories]
+    def get_categories_version(db: Session) -> str:
+        """Get the category index's version (see CategoryIndex.version), for the categories ETag."""
+        category_index.ensure_fresh(db)
+        return category_index.version()
+    
+    @staticmethod
+    def get_categories(db: Session, with_counts: bool = False) -> List:
+        """
+        Get all unique product categories, sorted, from the category index.
+        With with_counts, return dicts with each category's product and in-stock counts.
+        """
+        category_index.ensure_fresh(db)
+        if with_counts:
+            return category_index.counts()
+        return category_index.categories()
     
     @staticmethod
     def check_stock_availability(db: Session, product_id: int, quantity: int) -> bool:
@@ -102,12 +220,86 @@ class ProductService:
     @staticmethod
     def reduce_stock(db: Session, product_id: int, quantity: int) -> None:
         """Reduce product stock."""
-        product = ProductService.get_product_by_id(db, product_id)
+        sold_out = ProductService.decrement_stock(db, {product_id: quantity})
+        db.commit()
+        ProductService.notify_stock_decremented({product_id: quantity}, sold_out)
+    
+    @staticmethod
+    def decrement_stock(db: Session, quantities: Dict[int, int]) -> List[str]:
+        """
+        Atomically decrement stock for several products in one statement.
+        Each row is only updated if it still has enough stock; if any product is
+        short, the transaction is rolled back and InsufficientStockException is
+        raised. Does not commit, so the caller can make it part of a larger
+        transaction (call notify_stock_decremented after committing).
+        With stock reservations enabled, units held for carts do not count as stock.
+        Returns the categories of products that sold out, for the category index.
+        """
+        if not quantities:
+            return []
         
-        if product.stock_quantity < quantity:
-            raise BadRequestException(
-                f"Insufficient stock for {product.name}. Available: {product.stock_quantity}, Requested: {quantity}"
-            )
+        requested = case(quantities, value=Product.id)
+        available = Product.stock_quantity
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            available = Product.stock_quantity - Product.reserved_quantity
+        result = db.execute(
+            update(Product)
+            .where(Product.id.in_(list(quantities)), available >= requested)
+            .values(stock_quantity=Product.stock_quantity - requested)
+            .execution_options(synchronize_session=False)
+        )
         
-        product.stock_quantity -= quantity
-        db.commit()
+        if result.rowcount != len(quantities):
+            db.rollback()
+            ProductService._raise_insufficient_stock(db, quantities)
+        
+        return ProductService._sold_out_categories(db, list(quantities))
+    
+    @staticmethod
+    def _sold_out_categories(db: Session, product_ids: List[int]) -> List[str]:
+        """Categories of just-decremented products that are now out of stock."""
+        if not category_index.loaded:
+            return []
+        # Every updated row had stock before, so a zero now means it just sold out
+        sold_out = db.query(Product.category).filter(
+            Product.id.in_(product_ids), Product.stock_quantity == 0
+        ).all()
+        return [category for category, in sold_out]
+    
+    @staticmethod
+    def _raise_insufficient_stock(db: Session, quantities: Dict[int, int]) -> None:
+        """Report the first product that could not cover its requested quantity."""
+        products = db.query(Product).filter(Product.id.in_(list(quantities))).order_by(Product.id).all()
+        found = {product.id: product for product in products}
+        
+        for product_id, quantity in quantities.items():
+            product = found.get(product_id)
+            if product is None:
+                raise NotFoundException(f"Product with ID {product_id} not found")
+            available = product.stock_quantity
+            if settings.STOCK_RESERVATIONS_ENABLED:
+                available -= product.reserved_quantity
+            if available < quantity:
+                raise InsufficientStockException(
+                    f"Insufficient stock for {product.name}. Available: {max(available, 0)}, Requested: {quantity}"
+                )
+        raise InsufficientStockException("Insufficient stock")
+    
+    @staticmethod
+    def refresh_replica(db: Session, product_ids: Iterable[int]) -> None:
+        """
+        Re-read products whose stock or holds changed into the catalog replica,
+        after committing (one query; no-op without the replica).
+        """
+        product_ids = list(product_ids)
+        if not product_ids or not catalog_replica.loaded:
+            return
+        for product in db.query(Product).filter(Product.id.in_(product_ids)).all():
+            catalog_replica.upsert(product)
+    
+    @staticmethod
+    def notify_stock_decremented(quantities: Dict[int, int], sold_out: Optional[List[str]] = None) -> None:
+        """Apply committed stock decrements to the in-memory catalog views."""
+        for product_id, quantity in quantities.items():
+            catalog_replica.adjust_stock(product_id, -quantity)
+        category_index.products_sold_out(sold_out or [])
@@ -0,0 +1,253 @@
+"""Bulk product import and export (CSV / NDJSON) with constant memory use."""
+import csv
+import io
+import json
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.product import Product
+from backend.schemas import ProductCreate
+from backend.services.catalog_replica import catalog_replica
+from backend.services.category_index import category_index
+from backend.services.search_index import product_search_index
+from backend.utils.exceptions import BadRequestException
+from backend.utils.streaming import export_value
+
+settings = get_settings()
+
+FORMATS = ("csv", "ndjson")
+IMPORT_MODES = ("insert", "upsert")
+EXPORT_COLUMNS = (
+    "id", "name", "description", "price", "category", "stock_quantity", "image_url", "created_at", "updated_at"
+)
+# Rejected rows reported per batch; the rest are only counted
+MAX_ERRORS_PER_BATCH = 20
+
+# (line number, parsed row or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def format_for_filename(filename: str, default: str = "csv") -> str:
+    """Guess the transfer format from a file name's extension."""
+    lowered = filename.lower()
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise BadRequestException(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+class ProductTransferService:
+    """Service class for bulk product import and export."""
+
+    # ----- Import -----
+
+    @staticmethod
+    def parse_rows(stream: BinaryIO, fmt: str) -> Iterator[ParsedRow]:
+        """Parse a CSV (with header row) or NDJSON byte stream one row at a time."""
+        _check_format(fmt)
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Empty cells mean "not given", so optional columns become None
+                values = {key: value for key, value in row.items() if key and value not in ("", None)}
+                yield reader.line_num, values, None
+            return
+
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, None, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, row, None
+
+    @staticmethod
+    def _validate(row: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        """
+        Validate a row against ProductCreate; upserts keep an optional integer id.
+        Only the columns the row gives are returned, so an upsert leaves the
+        others of an existing product as they are.
+        """
+        values = ProductCreate.model_validate(row).model_dump(exclude_unset=True)
+        if mode == "upsert" and row.get("id") not in (None, ""):
+            try:
+                values["id"] = int(row["id"])
+            except (TypeError, ValueError):
+                raise ValueError(f"id: invalid integer {row['id']!r}")
+        return values
+
+    @staticmethod
+    def _write_batch(db: Session, rows: List[Dict[str, Any]], mode: str) -> Tuple[int, int]:
+        """Insert/update one batch with executemany statements and commit; returns (inserted, updated)."""
+        updates: List[Dict[str, Any]] = []
+        if mode == "upsert":
+            # The last row for an id wins
+            keyed = {row["id"]: row for row in rows if "id" in row}
+            rows = [row for row in rows if "id" not in row] + list(keyed.values())
+            ids = list(keyed)
+            existing = set(db.scalars(select(Product.id).where(Product.id.in_(ids)))) if ids else set()
+            updates = [row for row in rows if row.get("id") in existing]
+            rows = [row for row in rows if row.get("id") not in existing]
+
+        if rows:
+            db.execute(insert(Product), rows)
+        if updates:
+            db.execute(update(Product), updates)
+        db.commit()
+        return len(rows), len(updates)
+
+    @staticmethod
+    def import_products(
+        db: Session,
+        stream: BinaryIO,
+        fmt: str = "csv",
+        mode: str = "insert",
+        batch_size: Optional[int] = None
+    ) -> dict:
+        """
+        Import products from a CSV or NDJSON byte stream in batches.
+        Rows are validated against ProductCreate; invalid rows are skipped and
+        reported with their line number. Each batch is written with executemany
+        and committed on its own, so a failing batch does not undo earlier ones.
+        With mode="upsert", rows whose id matches an existing product update it;
+        all other rows are inserted. Returns counts, throughput and the batches
+        that had errors.
+        """
+        _check_format(fmt)
+        if mode not in IMPORT_MODES:
+            raise BadRequestException(f"Unsupported mode '{mode}'. Use one of: {', '.join(IMPORT_MODES)}")
+        batch_size = batch_size or settings.BULK_BATCH_SIZE
+
+        report = {"format": fmt, "mode": mode, "batch_size": batch_size, "rows": 0, "inserted": 0,
+                  "updated": 0, "rejected": 0, "batches": 0, "failed_batches": 0, "errors": []}
+        start = time.perf_counter()
+
+        def flush(batch: List[Dict[str, Any]], errors: List[dict], first_line: int, last_line: int, rejected: int):
+            report["batches"] += 1
+            entry = {"batch": report["batches"], "lines": [first_line, last_line], "rejected": rejected}
+            if batch:
+                try:
+                    inserted, updated = ProductTransferService._write_batch(db, batch, mode)
+                    report["inserted"] += inserted
+                    report["updated"] += updated
+                except Exception as exc:
+                    db.rollback()
+                    report["failed_batches"] += 1
+                    report["rejected"] += len(batch)
+                    entry["rejected"] += len(batch)
+                    entry["batch_error"] = str(getattr(exc, "orig", exc)).splitlines()[0]
+            if errors or "batch_error" in entry:
+                entry["errors"] = errors
+                report["errors"].append(entry)
+
+        batch: List[Dict[str, Any]] = []
+        errors: List[dict] = []
+        rejected = 0
+        first_line = last_line = 0
+        for line_number, row, parse_error in ProductTransferService.parse_rows(stream, fmt):
+            report["rows"] += 1
+            first_line = first_line or line_number
+            last_line = line_number
+            if parse_error is None:
+                try:
+                    batch.append(ProductTransferService._validate(row, mode))
+                except ValidationError as exc:
+                    parse_error = _validation_message(exc)
+                except ValueError as exc:
+                    parse_error = str(exc)
+            if parse_error:
+                rejected += 1
+                report["rejected"] += 1
+                if len(errors) < MAX_ERRORS_PER_BATCH:
+                    errors.append({"line": line_number, "error": parse_error})
+
+            if len(batch) + rejected >= batch_size:
+                flush(batch, errors, first_line, last_line, rejected)
+                batch, errors, rejected, first_line = [], [], 0, 0
+        if batch or rejected:
+            flush(batch, errors, first_line, last_line, rejected)
+
+        elapsed = time.perf_counter() - start
+        report["seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed > 0 else None
+
+        if report["inserted"] or report["updated"]:
+            ProductTransferService._reload_catalog_views(db)
+        return report
+
+    @staticmethod
+    def _reload_catalog_views(db: Session) -> None:
+        """Rebuild the in-memory catalog views that are in use after a bulk write."""
+        if catalog_replica.loaded:
+            catalog_replica.load(db)
+        if product_search_index.loaded:
+            product_search_index.load(db)
+        if category_index.loaded:
+            category_index.load(db)
+
+    # ----- Export -----
+
+    @staticmethod
+    def export_products(
+        session_factory: Callable[[], Session],
+        fmt: str = "csv",
+        batch_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream every product as CSV (with header row) or NDJSON, one chunk per batch.
+        Rows are fetched with a server-side cursor (yield_per), so memory stays
+        constant however large the table is. The generator opens and closes its
+        own session, as it outlives the request's.
+        """
+        _check_format(fmt)
+        batch_size = batch_size or settings.BULK_BATCH_SIZE
+        columns = [getattr(Product, name) for name in EXPORT_COLUMNS]
+
+        db = session_factory()
+        try:
+            result = db.execute(
+                select(*columns).order_by(Product.id).execution_options(stream_results=True, yield_per=batch_size)
+            )
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            if fmt == "csv":
+                writer.writerow(EXPORT_COLUMNS)
+
+            for rows in result.partitions():
+                for row in rows:
+                    values = [export_value(value) for value in row]
+                    if fmt == "csv":
+                        writer.writerow(values)
+                    else:
+                        buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False))
+                        buffer.write("\n")
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+            if buffer.tell():  # header of an empty CSV export
+                yield buffer.getvalue().encode("utf-8")
+        finally:
+            db.close()
@@ -0,0 +1,288 @@
+"""Time-limited stock reservations ("holds") placed when items are added to a cart.
+
+With ``STOCK_RESERVATIONS_ENABLED`` every cart line holds its quantity in the
+``stock_reservations`` table for ``RESERVATION_TTL_SECONDS``, restarted
+whenever the line changes. ``products.reserved_quantity`` is kept equal to the
+sum of a product's hold rows, so available stock is ``stock_quantity -
+reserved_quantity`` and a hold is placed with one conditional UPDATE, the same
+way checkout decrements stock. Holds change a product's
+``available_quantity``, so like any other update they bump its version and
+``updated_at``. Checkout turns the user's holds into stock
+decrements without checking availability again. Expired holds keep counting
+until ``reservation_sweeper`` releases them in bulk, within one
+``RESERVATION_SWEEP_INTERVAL_SECONDS``.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.product import Product
+from backend.models.reservation import StockReservation
+from backend.services.product_service import ProductService
+from backend.utils.exceptions import InsufficientStockException
+
+settings = get_settings()
+
+
+def _utc_now() -> datetime:
+    # Timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ReservationService:
+    """Service class for stock reservations."""
+
+    @staticmethod
+    def _unreserve(db: Session, quantities: Dict[int, int]) -> None:
+        """Subtract released holds from the products' reserved quantities (no commit)."""
+        if not quantities:
+            return
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(list(quantities)))
+            .values(reserved_quantity=Product.reserved_quantity - case(quantities, value=Product.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def lock_product(db: Session, product_id: int) -> None:
+        """
+        Lock the product's row until the transaction ends, so concurrent changes
+        to holds on it, and to the cart lines they belong to, run one at a time.
+        Take it before reading the cart line the hold is for.
+        """
+        db.query(Product.id).filter(Product.id == product_id).with_for_update().first()
+
+    @staticmethod
+    def lock_products(db: Session, product_ids: Iterable[int]) -> None:
+        """
+        Lock several products' rows (see lock_product), in ascending id order
+        like the sweeper's UPDATE, so transactions locking overlapping products
+        cannot deadlock.
+        """
+        product_ids = sorted(set(product_ids))
+        if product_ids:
+            db.query(Product.id).filter(Product.id.in_(product_ids)).order_by(Product.id).with_for_update().all()
+
+    @staticmethod
+    def hold(db: Session, user_id: int, product: Any, quantity: int, commit: bool = True) -> None:
+        """
+        Set the user's hold on product to quantity and restart its TTL.
+        Only the difference to the current hold is reserved, with one conditional
+        UPDATE that fails if fewer units are available than it needs. With
+        commit=False the hold becomes part of the caller's transaction (the cart
+        write), which must not have other changes yet: a failed hold rolls back.
+        Without a row lock on the missing hold (SQLite, or no lock_product), a
+        concurrent first hold on the same line raises IntegrityError.
+        """
+        reservation = db.query(StockReservation).filter(
+            StockReservation.user_id == user_id, StockReservation.product_id == product.id
+        ).with_for_update().first()
+        held = reservation.quantity if reservation else 0
+        delta = quantity - held
+
+        if delta:
+            statement = update(Product).where(Product.id == product.id)
+            if delta > 0:
+                statement = statement.where(Product.stock_quantity - Product.reserved_quantity >= delta)
+            result = db.execute(
+                statement
+                .values(reserved_quantity=Product.reserved_quantity + delta)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                db.rollback()
+                stock, reserved = db.query(Product.stock_quantity, Product.reserved_quantity).filter(
+                    Product.id == product.id
+                ).one()
+                raise InsufficientStockException(
+                    f"Insufficient stock for {product.name}. Available: {max(stock - reserved + held, 0)}"
+                )
+
+        expires_at = _utc_now() + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+        if reservation:
+            reservation.quantity = quantity
+            reservation.expires_at = expires_at
+        else:
+            db.add(StockReservation(user_id=user_id, product_id=product.id, quantity=quantity, expires_at=expires_at))
+            # Surface a conflicting concurrent insert here rather than at the caller's commit
+            db.flush()
+        if commit:
+            db.commit()
+
+    @staticmethod
+    def release(
+        db: Session, user_id: int, product_ids: Optional[Iterable[int]] = None, commit: bool = True
+    ) -> List[int]:
+        """Release the user's holds (only those on product_ids, if given); returns the products released."""
+        if product_ids is None:
+            product_ids = [
+                product_id for product_id, in db.query(StockReservation.product_id).filter(StockReservation.user_id == user_id)
+            ]
+        product_ids = list(product_ids)
+        # Product rows before hold rows, the order every other hold change takes
+        ReservationService.lock_products(db, product_ids)
+        query = db.query(StockReservation.id, StockReservation.product_id, StockReservation.quantity).filter(
+            StockReservation.user_id == user_id
+        )
+        query = query.filter(StockReservation.product_id.in_(product_ids))
+        holds = query.with_for_update().all()
+        if not holds:
+            return []
+
+        ReservationService._unreserve(db, {hold.product_id: hold.quantity for hold in holds})
+        db.query(StockReservation).filter(StockReservation.id.in_([hold.id for hold in holds])).delete(
+            synchronize_session=False
+        )
+        if commit:
+            db.commit()
+        return [hold.product_id for hold in holds]
+
+    @staticmethod
+    def checkout(db: Session, user_id: int, quantities: Dict[int, int]) -> List[str]:
+        """
+        Convert the user's holds into stock decrements as part of the checkout
+        transaction (does not commit; call ProductService.notify_stock_decremented
+        after committing).
+        Products whose hold covers the ordered quantity are decremented in one
+        statement without checking availability again. Lines without a hold
+        (it expired and was swept) or with a smaller one go through
+        ProductService.decrement_stock, which checks available stock and
+        raises if it is short. Returns the categories of products that sold out.
+        """
+        # Product rows before hold rows, the order every other hold change takes
+        ReservationService.lock_products(db, quantities)
+        holds = dict(
+            db.query(StockReservation.product_id, StockReservation.quantity).filter(
+                StockReservation.user_id == user_id, StockReservation.product_id.in_(list(quantities))
+            ).with_for_update().all()
+        )
+        covered = {
+            product_id: quantity for product_id, quantity in quantities.items() if holds.get(product_id, 0) >= quantity
+        }
+        uncovered = {product_id: quantity for product_id, quantity in quantities.items() if product_id not in covered}
+
+        # A hold that does not cover its line is released, and the line checked like any other
+        ReservationService._unreserve(db, {product_id: holds[product_id] for product_id in uncovered if product_id in holds})
+        sold_out = ProductService.decrement_stock(db, uncovered)
+
+        if covered:
+            requested = case(covered, value=Product.id)
+            held = case({product_id: holds[product_id] for product_id in covered}, value=Product.id)
+            result = db.execute(
+                update(Product)
+                # Only guards against stock lowered below the held units by an admin
+                .where(Product.id.in_(list(covered)), Product.stock_quantity >= requested)
+                .values(
+                    stock_quantity=Product.stock_quantity - requested,
+                    reserved_quantity=Product.reserved_quantity - held
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(covered):
+                db.rollback()
+                ProductService._raise_insufficient_stock(db, covered)
+            sold_out += ProductService._sold_out_categories(db, list(covered))
+
+        if holds:
+            db.query(StockReservation).filter(
+                StockReservation.user_id == user_id, StockReservation.product_id.in_(list(holds))
+            ).delete(synchronize_session=False)
+        return sold_out
+
+    @staticmethod
+    def sweep(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Release every hold that expired by now with set-based statements (one
+        UPDATE of the affected products, one DELETE) and commit.
+        Returns the number of holds released.
+        """
+        expired = StockReservation.expires_at <= (now or _utc_now())
+        product_ids = [
+            product_id for product_id, in db.query(StockReservation.product_id).filter(expired).distinct()
+        ]
+        if not product_ids:
+            return 0
+
+        expired_units = select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(
+            StockReservation.product_id == Product.id, expired
+        ).scalar_subquery()
+        db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids))
+            .values(reserved_quantity=Product.reserved_quantity - expired_units)
+            .execution_options(synchronize_session=False)
+        )
+        released = db.query(StockReservation).filter(expired).delete(synchronize_session=False)
+        db.commit()
+        ProductService.refresh_replica(db, product_ids)
+        return released
+
+
+class ReservationSweeper:
+    """Background thread releasing expired holds every interval_seconds."""
+
+    def __init__(self, interval_seconds: float = 30.0):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.sweeps = 0
+        self.holds_released = 0
+        self.errors = 0
+        self.last_sweep_at: Optional[datetime] = None
+
+    def sweep(self, session_factory: Callable[[], Session]) -> int:
+        """Run one sweep in its own session; returns the number of holds released."""
+        db = session_factory()
+        try:
+            released = ReservationService.sweep(db)
+        except Exception:
+            db.rollback()
+            self.errors += 1
+            raise
+        finally:
+            db.close()
+        self.sweeps += 1
+        self.holds_released += released
+        self.last_sweep_at = _utc_now()
+        return released
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Start the background sweeper (no-op if the interval is 0)."""
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                try:
+                    self.sweep(session_factory)
+                except Exception as exc:
+                    print(f"Reservation sweep failed, will retry: {exc}")
+
+        self._thread = threading.Thread(target=run, name="reservation-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sweeper."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Report sweeper activity counters."""
+        return {
+            "enabled": settings.STOCK_RESERVATIONS_ENABLED,
+            "ttl_seconds": settings.RESERVATION_TTL_SECONDS,
+            "sweep_interval_seconds": self.interval_seconds,
+            "sweeps": self.sweeps,
+            "holds_released": self.holds_released,
+            "errors": self.errors,
+            "last_sweep_at": self.last_sweep_at.isoformat() if self.last_sweep_at else None,
+        }
+
+
+reservation_sweeper = ReservationSweeper(interval_seconds=settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,207 @@
+"""In-process full-text search index for products.
+
+Products are tokenized into an inverted index over name, category and
+description (weighted in that order). Queries are ANDed by default; separating
+terms with ``OR`` matches any of them. Results are ranked with BM25 and the
+index is updated incrementally by ``ProductService`` whenever a product is
+created, updated or deleted.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.config import get_settings
+from backend.models.product import Product
+
+settings = get_settings()
+
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(token: str) -> str:
+    """Fold simple English plurals so 'shoes' matches 'shoe'."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized lowercase terms."""
+    if not text:
+        return []
+    return [_normalize(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def parse_query(query: str) -> Tuple[List[str], bool]:
+    """
+    Parse a search query into terms and a match mode.
+    Returns (terms, match_all); terms separated by OR match any of them.
+    """
+    match_all = re.search(r"\s+OR\s+", query) is None
+    terms = [term for term in tokenize(query) if term != "or" or match_all]
+    return list(dict.fromkeys(terms)), match_all
+
+
+class ProductSearchIndex:
+    """Thread-safe inverted index with BM25 ranking."""
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._doc_categories: Dict[int, str] = {}
+        self._total_length = 0.0
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.queries = 0
+        self.reloads = 0
+        self.updates = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been built."""
+        return self._loaded
+
+    def is_stale(self) -> bool:
+        """Whether the index is past its rebuild interval."""
+        return not self._loaded or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index from the products table."""
+        rows = db.query(
+            Product.id, Product.name, Product.description, Product.category
+        ).yield_per(1000)
+        fresh = ProductSearchIndex(self.ttl_seconds)
+        for row in rows:
+            fresh._add(row.id, row.name, row.description, row.category)
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_lengths = fresh._doc_lengths
+            self._doc_categories = fresh._doc_categories
+            self._total_length = fresh._total_length
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Rebuild the index if it has not been built or has expired."""
+        if self.is_stale():
+            self.load(db)
+
+    # ----- Incremental updates -----
+
+    def index_product(self, product: Product) -> None:
+        """Add or re-index a product after it was created or updated."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(product.id)
+            self._add(product.id, product.name, product.description, product.category)
+            self.updates += 1
+
+    def remove_product(self, product_id: int) -> None:
+        """Drop a product from the index after it was deleted."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(product_id)
+            self.updates += 1
+
+    def _add(self, product_id: int, name: str, description: Optional[str], category: str) -> None:
+        weights: Dict[str, float] = {}
+        for field, text in (("name", name), ("category", category), ("description", description)):
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[product_id] = weight
+
+        length = sum(weights.values())
+        self._doc_terms[product_id] = weights
+        self._doc_lengths[product_id] = length
+        self._doc_categories[product_id] = category
+        self._total_length += length
+
+    def _remove(self, product_id: int) -> None:
+        weights = self._doc_terms.pop(product_id, None)
+        if weights is None:
+            return
+        for term in weights:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(product_id, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(product_id)
+        self._doc_categories.pop(product_id, None)
+
+    # ----- Queries -----
+
+    def search(self, query: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[int]:
+        """Return matching product IDs, best match first (at most limit IDs)."""
+        terms, match_all = parse_query(query)
+        self.queries += 1
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if match_all and not all(postings):
+                return []
+
+            total_docs = len(self._doc_terms)
+            average_length = self._total_length / total_docs if total_docs else 1.0
+            doc_lengths = self._doc_lengths
+            doc_categories = self._doc_categories
+            scores: Dict[int, float] = {}
+
+            # Accumulate BM25 term by term, rarest term first so AND queries
+            # only ever score the candidates of the most selective term
+            for index, posting in enumerate(sorted(postings, key=len)):
+                idf = math.log(1 + (total_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                if match_all and index > 0:
+                    entries = [(pid, posting[pid]) for pid in scores if pid in posting]
+                    scores = {pid: scores[pid] for pid, _ in entries}
+                else:
+                    entries = posting.items()
+                for product_id, weight in entries:
+                    if category and doc_categories.get(product_id) != category:
+                        continue
+                    norm = K1 * (1 - B + B * doc_lengths[product_id] / average_length)
+                    scores[product_id] = scores.get(product_id, 0.0) + idf * weight * (K1 + 1) / (weight + norm)
+
+        ranked = ((-score, product_id) for product_id, score in scores.items())
+        if limit is not None:
+            best = heapq.nsmallest(limit, ranked)
+        else:
+            best = sorted(ranked)
+        return [product_id for _, product_id in best]
+
+    def stats(self) -> dict:
+        """Report index size and activity counters."""
+        return {
+            "backend": settings.SEARCH_BACKEND,
+            "loaded": self._loaded,
+            "documents": len(self._doc_terms),
+            "terms": len(self._postings),
+            "queries": self.queries,
+            "updates": self.updates,
+            "reloads": self.reloads,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 3) if self._loaded else None,
+        }
+
+
+product_search_index = ProductSearchIndex(ttl_seconds=settings.SEARCH_INDEX_TTL_SECONDS)
@@ -4,7 +4,7 @@ from typing import Optional
 from backend.models.user import User
 from backend.schemas import UserCreate, UserUpdate
 from backend.utils.exceptions import NotFoundException, BadRequestException, UnauthorizedException
-from backend.utils.auth import hash_password, verify_password, create_access_token
+from backend.utils.auth import hash_password, verify_and_update_password, create_access_token
 from backend.utils.validators import validate_email
 
 
@@ -12,8 +12,8 @@ class UserService:
     """Service class for user operations."""
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
-        """Create a new user (registration)."""
+    def check_new_user(db: Session, user_data: UserCreate) -> None:
+        """Validate a registration's email and check its username and email are free."""
         # Validate email
         validate_email(user_data.email)
         
@@ -26,9 +26,19 @@ class UserService:
         existing_email = db.query(User).filter(User.email == user_data.email).first()
         if existing_email:
             raise BadRequestException(f"Email '{user_data.email}' already registered")
+    
+    @staticmethod
+    def create_user(db: Session, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """
+        Create a new user (registration). hashed_password, if given, was hashed
+        by the caller (see routes.users.register_user); otherwise the password
+        is hashed inline.
+        """
+        UserService.check_new_user(db, user_data)
         
         # Hash password
-        hashed_password = hash_password(user_data.password)
+        if hashed_password is None:
+            hashed_password = hash_password(user_data.password)
         
         # Create user
         user = User(
@@ -47,17 +57,36 @@ class UserService:
     @staticmethod
     def authenticate_user(db: Session, username: str, password: str) -> tuple[User, str]:
         """Authenticate user and return user object with access token."""
+        user = UserService.get_login_user(db, username)
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        return UserService.complete_login(db, user, valid, new_hash)
+    
+    @staticmethod
+    def get_login_user(db: Session, username: str) -> User:
+        """Get the user logging in as username (first step of authenticate_user)."""
         user = db.query(User).filter(User.username == username).first()
         
         if not user:
             raise UnauthorizedException("Invalid username or password")
-        
-        if not verify_password(password, user.hashed_password):
+        return user
+    
+    @staticmethod
+    def complete_login(db: Session, user: User, valid: bool, new_hash: Optional[str]) -> tuple[User, str]:
+        """
+        Finish a login once the password was checked: return the user with an
+        access token. user may be detached from db.
+        """
+        if not valid:
             raise UnauthorizedException("Invalid username or password")
         
         if not user.is_active:
             raise UnauthorizedException("User account is inactive")
         
+        # Transparently upgrade hashes made with a different BCRYPT_ROUNDS
+        if new_hash:
+            db.query(User).filter(User.id == user.id).update({"hashed_password": new_hash})
+            db.commit()
+        
         # Create access token
         access_token = create_access_token(data={"sub": str(user.id), "username": user.username})
         
@@ -0,0 +1,30 @@
+"""Helpers for running the sync service layer on an async session."""
+from typing import Any, Callable, Optional, Type
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def run_service(
+    db: AsyncSession,
+    fn: Callable[..., Any],
+    *args,
+    schema: Optional[Type[BaseModel]] = None,
+    **kwargs
+) -> Any:
+    """
+    Run a sync service method on the async session's connection.
+    The method receives a regular Session as its first argument; its database
+    I/O goes through the async driver without occupying a threadpool thread.
+    If schema is given, the result (or each item of a list result) is validated
+    into it before leaving the session context, so no lazy load can be
+    triggered once control returns to the event loop.
+    """
+    def call(session):
+        result = fn(session, *args, **kwargs)
+        if schema is None or result is None:
+            return result
+        if isinstance(result, list):
+            return [schema.model_validate(item) for item in result]
+        return schema.model_validate(result)
+
+    return await db.run_sync(call)
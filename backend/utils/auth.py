@@ -1,24 +1,104 @@
-"""Authentication utilities for password hashing and JWT tokens."""
+"""Authentication utilities for password hashing and JWT tokens.
+
+The async hashing functions (``hash_password_async``,
+``verify_and_update_password_async``) run bcrypt in the worker pool the app
+starts with ``start_password_pool``, or on a threadpool thread when
+PASSWORD_HASH_WORKERS is 0, without blocking the event loop. The sync
+functions always hash inline: scripts importing this module (``init_db``)
+never start worker processes.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
 from backend.config import get_settings
 
 settings = get_settings()
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; hashes made with a different cost are flagged for rehash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt is CPU-bound, so the app runs it in a small process pool instead of on request threads
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+
+def start_password_pool() -> None:
+    """Start the hashing workers (app startup only) and spawn them ahead of the first login."""
+    global _hash_pool
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            return
+        # spawn, since forking a process that is running threads is unsafe
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    # Submitting one job per worker forces every process to spawn now
+    futures = [_hash_pool.submit(_hash, "warmup", 4) for _ in range(settings.PASSWORD_HASH_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def shutdown_password_pool() -> None:
+    """Stop the hashing workers."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True, cancel_futures=True)
+            _hash_pool = None
+
+
+def _hash(password: str, rounds: int) -> str:
+    return pwd_context.hash(password, rounds=rounds)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+async def _run_async(fn, *args):
+    pool = _hash_pool
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    # Awaiting the job frees the request's thread while it queues for a worker
+    return await asyncio.wrap_future(pool.submit(fn, *args))
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    """Hash a password using bcrypt (inline, on the calling thread)."""
+    return _hash(password, settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (inline, on the calling thread)."""
+    return _verify_and_update(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password against its hash (inline, on the calling thread).
+    Returns (valid, new_hash); new_hash is set when the stored hash uses an
+    outdated work factor and should be replaced.
+    """
+    return _verify_and_update(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password using bcrypt in the hashing pool."""
+    return await _run_async(_hash, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password in the hashing pool."""
+    return await _run_async(_verify_and_update, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,135 @@
+"""Response compression (gzip, and brotli when installed) for large JSON payloads.
+
+``CompressionMiddleware`` picks an encoding from the request's
+``Accept-Encoding`` (honouring q-values, preferring brotli on a tie) and
+compresses complete responses of a compressible content type once they reach
+``COMPRESSION_MIN_SIZE`` bytes. Responses that already have a
+``Content-Encoding`` and streaming responses (the exports, which are sent
+chunk by chunk so they start immediately) pass through unchanged.
+"""
+import gzip
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from backend.utils.metrics import http_compression_input_bytes_total, http_compression_output_bytes_total
+
+try:
+    import brotli
+except ImportError:  # optional dependency; only gzip is offered without it
+    brotli = None
+
+# Server preference when the client accepts several encodings equally
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type or "+xml" in content_type
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    codings: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """Pick the available encoding the client rates highest, or None for identity."""
+    codings = parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = codings.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete compressible responses."""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 brotli_enabled: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = tuple(
+            encoding for encoding in PREFERRED_ENCODINGS
+            if encoding != "br" or (brotli_enabled and brotli is not None)
+        )
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress body with the given content coding."""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        start_message: List[dict] = []
+        passthrough = [False]
+
+        async def send_wrapper(message):
+            if passthrough[0]:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows what kind of response this is
+                start_message.append(message)
+                return
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+
+            start = start_message[0]
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            eligible = (
+                not message.get("more_body", False)
+                and "content-encoding" not in headers
+                and len(body) >= self.minimum_size
+                and _is_compressible(headers.get("content-type", ""))
+            )
+            if not eligible:
+                passthrough[0] = True
+                await send(start)
+                await send(message)
+                return
+
+            # The representation depends on Accept-Encoding whether or not we compress
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                compressed = self.compress(body, encoding)
+                http_compression_input_bytes_total.inc(encoding, amount=len(body))
+                http_compression_output_bytes_total.inc(encoding, amount=len(compressed))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                message = {**message, "body": compressed}
+            passthrough[0] = True
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
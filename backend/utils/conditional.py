@@ -0,0 +1,91 @@
+"""Conditional GET helpers (ETag / Last-Modified / 304 Not Modified)."""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that identify a representation."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps come from SQLite, which stores UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as required for If-None-Match."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Set validator and Cache-Control headers on the route's response.
+    Returns a 304 response if the client's copy is still current, else None.
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if last_modified is not None:
+        last_modified = _as_utc(last_modified)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and last_modified) and _not_modified_since(if_modified_since, last_modified)
+
+    return Response(status_code=304, headers=headers) if fresh else None
+
+
+def check_categories_not_modified(request: Request, response: Response, version: str) -> Optional[Response]:
+    """check_not_modified for the category list, given ProductService.get_categories_version()."""
+    return check_not_modified(request, response, make_etag("categories", version))
+
+
+def check_listing_not_modified(request: Request, response: Response, rows) -> Optional[Response]:
+    """
+    check_not_modified for a page of products, from the rows on it: a row's
+    version changes on every update, and the ID list on inserts and deletes
+    that reach the page. Listings send no Last-Modified: the newest timestamp
+    on a page does not change when a row leaves it, so If-Modified-Since alone
+    cannot validate one.
+    """
+    return check_not_modified(request, response, make_etag("products", *(f"{row.id}.{row.version}" for row in rows)))
+
+
+def check_product_not_modified(request: Request, response: Response, product) -> Optional[Response]:
+    """check_not_modified for a single product."""
+    modified = product.updated_at or product.created_at
+    return check_not_modified(request, response, make_etag("product", product.id, product.version), modified)
@@ -0,0 +1,203 @@
+"""Connection pool instrumentation and liveness checks.
+
+``InstrumentedQueuePool`` (and its asyncio counterpart) time every checkout
+so pool waits, timeouts and connect errors can be inspected at
+``/health/pool``. ``warm_pool`` opens connections at startup so the first
+requests do not pay for connecting. ``install_liveness_check`` replaces ``pool_pre_ping``'s
+round trip on every checkout with one that only pings connections that sat
+idle in the pool for a while.
+"""
+import threading
+import time
+from typing import Dict, List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from backend.utils.metrics import gauge_lines
+
+
+class PoolMetrics:
+    """Counters for connection checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.connect_errors = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_checkout(self, wait: float) -> None:
+        """Record a successful checkout and how long it waited."""
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def record_failure(self, timed_out: bool) -> None:
+        """Record a checkout that timed out or could not connect."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.connect_errors += 1
+
+    def to_dict(self) -> dict:
+        """Convert counters to dictionary."""
+        return {
+            "checkouts": self.checkouts,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "timeouts": self.timeouts,
+            "connect_errors": self.connect_errors,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Times QueuePool._do_get, which blocks while the pool is exhausted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception as exc:
+            self.metrics.record_failure(timed_out=isinstance(exc, PoolTimeoutError))
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool that records checkout metrics."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout metrics."""
+
+
+def install_liveness_check(engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping connections on checkout only if they were idle for more than idle_seconds.
+    A failed ping raises DisconnectionError, so the pool discards the connection
+    and transparently retries with a fresh one.
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin <= idle_seconds:
+            return
+
+        metrics = getattr(engine.pool, "metrics", None)
+        if metrics is not None:
+            metrics.pings += 1
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as exc:
+            if metrics is not None:
+                metrics.ping_failures += 1
+            raise DisconnectionError() from exc
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+def _warmup_count(engine: Engine, connections: int) -> int:
+    pool = engine.pool
+    # Only a QueuePool keeps several connections; beyond its size they would be closed on return
+    return min(connections, pool.size()) if isinstance(pool, QueuePool) else min(connections, 1)
+
+
+def warm_pool(engine: Engine, connections: int) -> int:
+    """
+    Open up to connections pool connections (at most the pool size) and return
+    them to the pool. They are held together, so each checkout connects anew.
+    Returns the number of connections opened.
+    """
+    held = []
+    try:
+        for _ in range(_warmup_count(engine, connections)):
+            held.append(engine.connect())
+    finally:
+        for connection in held:
+            connection.close()
+    return len(held)
+
+
+async def warm_async_pool(async_engine: AsyncEngine, connections: int) -> int:
+    """Async counterpart of warm_pool."""
+    held = []
+    try:
+        for _ in range(_warmup_count(async_engine.sync_engine, connections)):
+            connection = async_engine.connect()
+            await connection.start()
+            held.append(connection)
+    finally:
+        for connection in held:
+            await connection.close()
+    return len(held)
+
+
+def pool_stats(engine: Engine) -> dict:
+    """Report pool occupancy and checkout metrics."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.to_dict())
+    return stats
+
+
+_POOL_GAUGES = (
+    ("checked_out", "db_pool_checked_out", "Connections currently checked out."),
+    ("overflow", "db_pool_overflow", "Overflow connections beyond the pool size (negative while below it)."),
+    ("checkouts", "db_pool_checkouts", "Connection checkouts since startup."),
+    ("wait_ms_max", "db_pool_wait_ms_max", "Longest checkout wait in milliseconds."),
+    ("timeouts", "db_pool_timeouts", "Checkouts that timed out waiting for a connection."),
+    ("connect_errors", "db_pool_connect_errors", "Checkouts that failed to connect."),
+)
+
+
+def pool_metric_lines(engines: Dict[str, Engine]) -> List[str]:
+    """Render pool statistics of the given engines as Prometheus gauges."""
+    stats = {name: pool_stats(engine) for name, engine in engines.items()}
+    lines: List[str] = []
+    for key, metric, documentation in _POOL_GAUGES:
+        samples = {(name,): values[key] for name, values in stats.items() if key in values}
+        if samples:
+            lines.extend(gauge_lines(metric, documentation, ("engine",), samples))
+    return lines
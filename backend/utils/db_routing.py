@@ -0,0 +1,174 @@
+"""Read/write splitting across the primary database and read replicas.
+
+Write paths and anything that must see the latest data use ``get_db`` (the
+primary). Read-only endpoints use ``get_read_db``, which hands out a session
+on a replica chosen by ``ReplicaRouter``:
+
+- ``round_robin`` rotates through the healthy replicas;
+- ``least_connections`` picks the healthy replica with the fewest checked-out
+  connections.
+
+A replica that fails to connect is taken out of rotation for
+``DB_REPLICA_RETRY_SECONDS``; with no healthy replica, reads go to the primary.
+Read-your-writes: a commit on a client's primary session pins that client
+(its Authorization header, else its address) to the primary for
+``DB_REPLICA_PIN_SECONDS``, longer than the replicas are expected to lag.
+Pins are kept per process, so with several workers use sticky sessions.
+"""
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+POLICIES = ("round_robin", "least_connections")
+# Expired pins are pruned once this many are held
+MAX_PINS = 10000
+
+
+def client_key(request: Request) -> str:
+    """Identify the client a request comes from, for primary pinning."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.client.host if request.client else ""
+
+
+class PrimaryPins:
+    """Clients whose reads go to the primary until their pin expires."""
+
+    def __init__(self, pin_seconds: float = 5.0):
+        self.pin_seconds = pin_seconds
+        self._lock = threading.Lock()
+        self._pins: Dict[str, float] = {}
+
+    def pin(self, key: str) -> None:
+        """Send the client's reads to the primary for pin_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._pins) >= MAX_PINS:
+                self._pins = {pinned: until for pinned, until in self._pins.items() if until > now}
+            self._pins[key] = now + self.pin_seconds
+
+    def is_pinned(self, key: str) -> bool:
+        until = self._pins.get(key)
+        return until is not None and until > time.monotonic()
+
+    def pin_after_commit(self, session: Any, request: Request) -> None:
+        """Pin the request's client once session (a sync Session) commits."""
+        key = client_key(request)
+        event.listen(session, "after_commit", lambda _session: self.pin(key))
+
+    def count(self) -> int:
+        now = time.monotonic()
+        return sum(1 for until in list(self._pins.values()) if until > now)
+
+
+@dataclass
+class ReplicaTarget:
+    """A read replica: its engine (sync engine for async ones), session factory and health."""
+    name: str
+    engine: Engine
+    session_factory: Callable[[], Any]
+    down_until: float = 0.0
+    reads: int = 0
+    failures: int = 0
+    last_error: Optional[str] = field(default=None)
+
+    def checked_out(self) -> int:
+        pool = self.engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+class ReplicaRouter:
+    """Chooses the replica for each read session, honouring primary pins."""
+
+    def __init__(
+        self,
+        targets: List[ReplicaTarget],
+        pins: PrimaryPins,
+        policy: str = "round_robin",
+        retry_seconds: float = 30.0
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replica policy '{policy}'. Use one of: {', '.join(POLICIES)}")
+        self.targets = targets
+        self.pins = pins
+        self.policy = policy
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.targets)
+
+    def pin_after_commit(self, session: Any, request: Request) -> None:
+        """Pin the request's client to the primary once session (a sync Session) commits."""
+        if self.enabled:
+            self.pins.pin_after_commit(session, request)
+
+    def candidates(self, key: Optional[str] = None) -> List[ReplicaTarget]:
+        """
+        Healthy replicas in the order to try them; empty if the client is
+        pinned to the primary or no replica is up.
+        """
+        if not self.enabled:
+            return []
+        if key is not None and self.pins.is_pinned(key):
+            with self._lock:
+                self.pinned_reads += 1
+            return []
+
+        now = time.monotonic()
+        healthy = [target for target in self.targets if target.down_until <= now]
+        if self.policy == "least_connections":
+            healthy.sort(key=lambda target: target.checked_out())
+        elif healthy:
+            start = next(self._rotation) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+        return healthy
+
+    def record_read(self, target: Optional[ReplicaTarget]) -> None:
+        """Count a read session handed out on target (None for the primary)."""
+        with self._lock:
+            if target is None:
+                self.primary_reads += 1
+            else:
+                target.reads += 1
+
+    def mark_down(self, target: ReplicaTarget, error: Exception) -> None:
+        """Take a replica that failed to connect out of rotation for retry_seconds."""
+        print(f"Read replica {target.name} unavailable, retrying in {self.retry_seconds}s: {error}")
+        with self._lock:
+            target.down_until = time.monotonic() + self.retry_seconds
+            target.failures += 1
+            target.last_error = str(error).splitlines()[0]
+
+    def stats(self) -> dict:
+        """Report per-replica health and read counters."""
+        now = time.monotonic()
+        return {
+            "policy": self.policy,
+            "pin_seconds": self.pins.pin_seconds,
+            "pinned_clients": self.pins.count(),
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "replicas": [
+                {
+                    "name": target.name,
+                    "healthy": target.down_until <= now,
+                    "reads": target.reads,
+                    "failures": target.failures,
+                    "checked_out": target.checked_out(),
+                    "last_error": target.last_error,
+                }
+                for target in self.targets
+            ],
+        }
@@ -0,0 +1,96 @@
+"""Fast JSON path for the large list endpoints.
+
+By default a list route returns ORM rows, FastAPI validates every row into its
+``response_model`` and encodes the result with the stdlib ``json`` module.
+With ``FAST_JSON_RESPONSES`` enabled, ``list_response`` copies exactly the
+response model's fields straight off the rows (which come from our own
+database, so they need no re-validation) and encodes them with ``orjson``
+when it is installed. Routes keep their ``response_model``, so the OpenAPI
+schema is unchanged.
+"""
+import json
+import typing
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from backend.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+settings = get_settings()
+
+
+def _encode_fallback(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (or compact stdlib json without it)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_encode_fallback
+        ).encode("utf-8")
+
+
+def _nested_model(annotation) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Return (model, is_list) for a field typed as a model, Optional model or list of models."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, typing.List):
+        model, _ = _nested_model(typing.get_args(annotation)[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _field_plan(schema: Type[BaseModel]) -> Tuple[Tuple[str, Optional[Type[BaseModel]], bool], ...]:
+    return tuple((name, *_nested_model(field.annotation)) for name, field in schema.model_fields.items())
+
+
+def _dump(obj: Any, schema: Type[BaseModel]) -> dict:
+    result = {}
+    for name, nested, many in _field_plan(schema):
+        value = getattr(obj, name)
+        if nested is not None and value is not None:
+            value = [_dump(item, nested) for item in value] if many else _dump(value, nested)
+        result[name] = value
+    return result
+
+
+def serialize(data: Any, schema: Type[BaseModel]) -> Any:
+    """Convert a row (or list of rows) to plain data shaped like schema."""
+    if isinstance(data, list):
+        return [_dump(item, schema) for item in data]
+    return _dump(data, schema)
+
+
+def list_response(data: Any, schema: Type[BaseModel], response: Optional[Response] = None):
+    """
+    Return data for FastAPI to validate and encode as usual, or, with
+    FAST_JSON_RESPONSES enabled, an already encoded FastJSONResponse.
+    Headers set on the route's injected response (e.g. X-Next-Cursor) are kept.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return data
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(serialize(data, schema), headers=headers)
@@ -0,0 +1,169 @@
+"""Sparse fieldsets (``fields=``) and summary views (``view=summary``) for list endpoints.
+
+``fields`` is a comma-separated list of response fields; nested fields are
+dotted (``items.product.name``), and naming a nested object without a dot
+returns all of its fields. ``view=summary`` selects the response schema's
+``summary_fields``. ``id`` is always included at every level that has one.
+
+A fieldset is parsed into a tree (``{"id": None, "product": {"name": None}}``).
+Services turn it into ``load_only``/eager-load options with ``load_options``,
+so only the requested columns are read, and routes encode the rows with
+``fieldset_response``, which copies only the requested fields. Sparse
+responses skip ``response_model`` validation, since they omit required fields.
+"""
+from typing import Any, Callable, Dict, List, Optional, Type
+from fastapi import Query, Response
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipProperty, joinedload, load_only, selectinload
+from backend.utils.exceptions import BadRequestException
+from backend.utils.fast_json import FastJSONResponse, _field_plan, list_response
+
+FieldTree = Dict[str, Optional[dict]]
+
+VIEWS = ("full", "summary")
+
+
+def _nested(schema: Type[BaseModel]) -> Dict[str, Optional[Type[BaseModel]]]:
+    return {name: nested for name, nested, _ in _field_plan(schema)}
+
+
+def _full_tree(schema: Type[BaseModel]) -> FieldTree:
+    return {
+        name: _full_tree(nested) if nested is not None else None
+        for name, nested in _nested(schema).items()
+    }
+
+
+def parse_fields(schema: Type[BaseModel], fields: str) -> FieldTree:
+    """Parse a comma-separated, dotted field list against schema."""
+    tree: FieldTree = {}
+    for path in filter(None, (part.strip() for part in fields.split(","))):
+        node, model = tree, schema
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            nested = _nested(model)
+            if name not in nested:
+                raise BadRequestException(f"Unknown field '{path}'")
+            last = depth == len(names) - 1
+            if nested[name] is None:
+                if not last:
+                    raise BadRequestException(f"Field '{name}' has no fields of its own (in '{path}')")
+                node[name] = None
+            elif last:
+                node[name] = merge_fields(node.get(name) or {}, _full_tree(nested[name]))
+            else:
+                node = node.setdefault(name, {})
+                model = nested[name]
+    if not tree:
+        raise BadRequestException("fields must name at least one field")
+    return _with_ids(tree, schema)
+
+
+def _with_ids(tree: FieldTree, schema: Type[BaseModel]) -> FieldTree:
+    nested = _nested(schema)
+    result = {"id": None} if "id" in nested else {}
+    for name, subtree in tree.items():
+        result[name] = _with_ids(subtree, nested[name]) if subtree is not None else None
+    return result
+
+
+def merge_fields(*trees: FieldTree) -> FieldTree:
+    """Union of field trees."""
+    result: FieldTree = {}
+    for tree in trees:
+        for name, subtree in tree.items():
+            if subtree is None:
+                result.setdefault(name, None)
+            else:
+                result[name] = merge_fields(result.get(name) or {}, subtree)
+    return result
+
+
+def resolve_fields(schema: Type[BaseModel], fields: Optional[str], view: str = "full") -> Optional[FieldTree]:
+    """The field tree requested by fields or view, or None for the full response."""
+    if fields is not None and view != "full":
+        raise BadRequestException("Use either fields or view, not both")
+    if fields is not None:
+        return parse_fields(schema, fields)
+    if view == "summary":
+        return parse_fields(schema, schema.summary_fields)
+    return None
+
+
+def sparse_fields(schema: Type[BaseModel]) -> Callable[..., Optional[FieldTree]]:
+    """Route dependency reading the fields and view query parameters for schema."""
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return; dotted for nested ones (e.g. product.name)"
+        ),
+        view: str = Query(
+            "full", pattern=f"^({'|'.join(VIEWS)})$", description="summary returns a fixed short set of fields"
+        )
+    ) -> Optional[FieldTree]:
+        return resolve_fields(schema, fields, view)
+
+    return dependency
+
+
+def load_options(entity: Any, tree: FieldTree, aliases: Optional[Dict[str, str]] = None) -> List[Any]:
+    """
+    Loader options reading only the tree's columns of entity (the primary key
+    always), and eager-loading the relationships it names the same way:
+    collections with selectinload, single objects with joinedload. aliases maps
+    response field names to mapped attribute names where they differ.
+    Fields that are not mapped attributes are ignored.
+    """
+    aliases = aliases or {}
+    attributes = inspect(entity).attrs
+    columns, options = [], []
+    for name, subtree in tree.items():
+        prop = attributes.get(aliases.get(name, name))
+        if prop is None:
+            continue
+        attribute = getattr(entity, prop.key)
+        if isinstance(prop, RelationshipProperty):
+            loader = selectinload(attribute) if prop.uselist else joinedload(attribute)
+            if subtree is not None:
+                loader = loader.options(*load_options(prop.mapper.class_, subtree, aliases))
+            options.append(loader)
+        else:
+            columns.append(attribute)
+    return [load_only(*columns), *options]
+
+
+def _project(obj: Any, tree: FieldTree) -> dict:
+    result = {}
+    for name, subtree in tree.items():
+        value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        if subtree is not None and value is not None:
+            value = [_project(item, subtree) for item in value] if isinstance(value, list) else _project(value, subtree)
+        result[name] = value
+    return result
+
+
+def project(data: Any, tree: FieldTree) -> Any:
+    """Copy only the tree's fields off a row (or list of rows)."""
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    return _project(data, tree)
+
+
+def fieldset_response(data: Any, tree: FieldTree, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Encode the tree's fields of data (see project). Headers set on the route's
+    injected response (e.g. X-Next-Cursor) are kept.
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(project(data, tree), headers=headers)
+
+
+def sparse_list_response(
+    data: Any, schema: Type[BaseModel], fields: Optional[FieldTree], response: Optional[Response] = None
+):
+    """fieldset_response when a fieldset was requested, else list_response."""
+    if fields is not None:
+        return fieldset_response(data, fields, response)
+    return list_response(data, schema, response)
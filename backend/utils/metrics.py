@@ -0,0 +1,218 @@
+"""In-process request and database metrics in Prometheus text format.
+
+``MetricsMiddleware`` records a latency histogram and a status-code counter
+per route template, plus the time each request spent in the database.
+``instrument_engine`` hooks SQLAlchemy cursor events to count and time
+statements by type. ``render_metrics`` produces the ``/metrics`` payload.
+Recording a sample is a bisect and a few dict updates under a lock.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Accumulated database time of the current request. Sync routes run in the
+# threadpool with a copy of the request's context, so the list is shared.
+_request_db_time: ContextVar[Optional[List[float]]] = ContextVar("request_db_time", default=None)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increment the counter for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_number(total)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((values, list(series)) for values, series in self._series.items())
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                labels = _format_labels(self.labels, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Database time spent per HTTP request.", ("method", "route"), QUERY_BUCKETS
+)
+db_queries_total = Counter("db_queries_total", "SQL statements executed by statement type.", ("statement",))
+db_query_errors_total = Counter("db_query_errors_total", "SQL statements that raised, by statement type.", ("statement",))
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "SQL statement latency by statement type.", ("statement",), QUERY_BUCKETS
+)
+http_compression_input_bytes_total = Counter(
+    "http_compression_input_bytes_total", "Response bytes before compression, by encoding.", ("encoding",)
+)
+http_compression_output_bytes_total = Counter(
+    "http_compression_output_bytes_total", "Response bytes after compression, by encoding.", ("encoding",)
+)
+
+_METRICS = (
+    http_requests_total,
+    http_request_duration_seconds,
+    http_request_db_seconds,
+    http_compression_input_bytes_total,
+    http_compression_output_bytes_total,
+    db_queries_total,
+    db_query_errors_total,
+    db_query_duration_seconds,
+)
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement executed through the engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        kind = _statement_type(statement)
+        db_queries_total.inc(kind)
+        db_query_duration_seconds.observe(elapsed, kind)
+        request_db_time = _request_db_time.get()
+        if request_db_time is not None:
+            request_db_time[0] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        if context.statement:
+            db_query_errors_total.inc(_statement_type(context.statement))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status codes and database time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+        db_time = [0.0]
+        token = _request_db_time.set(db_time)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db_time.reset(token)
+            route = scope.get("route")
+            # Label by route template, never the raw path, to keep cardinality bounded
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, template, str(status[0]))
+            http_request_duration_seconds.observe(elapsed, method, template)
+            http_request_db_seconds.observe(db_time[0], method, template)
+
+
+def gauge_lines(name: str, documentation: str, labels: Tuple[str, ...], samples: Dict[Tuple[str, ...], float]) -> List[str]:
+    """Render a gauge whose values are read at scrape time."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for values, value in sorted(samples.items()):
+        lines.append(f"{name}{_format_labels(labels, values)} {_format_number(value)}")
+    return lines
+
+
+def render_metrics(collectors: Tuple[Callable[[], List[str]], ...] = ()) -> str:
+    """Render all metrics, plus lines from extra collectors, in Prometheus text format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,67 @@
+"""Opaque cursor helpers for keyset pagination."""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import Response
+from backend.utils.exceptions import BadRequestException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":"), default=_encode_value)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid pagination cursor")
+
+    if not isinstance(position, dict):
+        raise BadRequestException("Invalid pagination cursor")
+    return position
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """Decode a cursor keyed on ``id``."""
+    position = decode_cursor(cursor)
+    if not isinstance(position.get("id"), int):
+        raise BadRequestException("Invalid pagination cursor")
+    return position["id"]
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a cursor holding a position in a ranked result list."""
+    position = decode_cursor(cursor)
+    if not isinstance(position.get("offset"), int) or position["offset"] < 0:
+        raise BadRequestException("Invalid pagination cursor")
+    return position["offset"]
+
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor keyed on ``(created_at, id)``."""
+    position = decode_cursor(cursor)
+    if not isinstance(position.get("id"), int) or not isinstance(position.get("created_at"), str):
+        raise BadRequestException("Invalid pagination cursor")
+    try:
+        return datetime.fromisoformat(position["created_at"]), position["id"]
+    except ValueError:
+        raise BadRequestException("Invalid pagination cursor")
+
+
+def set_next_cursor(response: Response, position: Optional[dict]) -> None:
+    """Expose the cursor for the next page, if there is one."""
+    if position is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(position)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
@@ -0,0 +1,57 @@
+"""SQL statement counting, for catching N+1 query regressions."""
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Records every SQL statement executed on an engine while active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        # Bound parameters of each statement (None for executemany batches)
+        self.parameters: List[Any] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(None if executemany else parameters)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """Count the SQL statements executed on engine inside the block."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._record)
+
+
+def assert_constant_queries(
+    engine: Engine,
+    exercise: Callable[[int], None],
+    sizes: List[int],
+    setup: Optional[Callable[[int], None]] = None
+) -> Dict[int, int]:
+    """
+    Fail if the number of statements issued by exercise(size) changes with size.
+    setup(size), if given, prepares a result set of that size and is not counted.
+    Returns the statement count per size.
+    """
+    counts = {}
+    for size in sizes:
+        if setup is not None:
+            setup(size)
+        with count_queries(engine) as counter:
+            exercise(size)
+        counts[size] = counter.count
+
+    if len(set(counts.values())) > 1:
+        raise AssertionError(f"Query count grows with result size: {counts}")
+    return counts
@@ -0,0 +1,51 @@
+"""Query plan capture, for catching queries that stop using their indexes.
+
+``explain`` runs the database's EXPLAIN for a statement with its bound
+parameters and ``plan_problems`` flags the two plan shapes the hot queries
+must avoid:
+
+- a full table scan (SQLite ``SCAN <table>`` without an index, MySQL ``type=ALL``);
+- a sort the index does not provide (SQLite ``USE TEMP B-TREE``, MySQL
+  ``Using filesort``).
+
+Only SQLite and MySQL plans are understood.
+"""
+import re
+from typing import Any, List
+from sqlalchemy.engine import Connection
+
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def explain(connection: Connection, statement: str, parameters: Any = None) -> List[str]:
+    """Return the plan of statement as one line per plan step."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).all()
+        return [row[3] for row in rows]
+    if dialect == "mysql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters or ()).mappings().all()
+        return [
+            f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} extra={row['Extra'] or ''}"
+            for row in rows
+        ]
+    raise ValueError(f"Query plans are not supported for {dialect}")
+
+
+def plan_problems(dialect: str, plan: List[str]) -> List[str]:
+    """Describe every full table scan and unindexed sort in plan (from explain)."""
+    problems = []
+    for step in plan:
+        if dialect == "sqlite":
+            scan = _SQLITE_FULL_SCAN.match(step)
+            if scan:
+                problems.append(f"full scan of {scan.group(1)}")
+            if step.startswith("USE TEMP B-TREE"):
+                problems.append(f"sort without an index ({step})")
+        elif dialect == "mysql":
+            table = step.split(":", 1)[0]
+            if " type=ALL " in step:
+                problems.append(f"full scan of {table}")
+            if "Using filesort" in step:
+                problems.append(f"filesort on {table}")
+    return problems
@@ -0,0 +1,125 @@
+"""Startup phase timing and request warmup.
+
+``startup_timer`` records how long each boot phase took (module imports,
+schema check, index loads, pool warmup, ...). The breakdown is printed once
+startup completes, served at ``/health/startup`` and exported as the
+``app_startup_seconds`` gauge, so a slower boot shows up as the phase that
+regressed.
+
+``warm_up`` sends the hot catalog requests through the app in-process before
+it serves traffic. The first request on each path otherwise pays for building
+the middleware stack, compiling its SQL statements (SQLAlchemy caches them
+per process) and first-use setup in the serializers and compressors. The
+warmup requests are counted in the request metrics like any other.
+"""
+import gzip
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from backend.utils.compression import brotli
+from backend.utils.metrics import gauge_lines
+
+# Hot read paths, warmed in order; the first listed product is fetched as well
+WARMUP_PATHS = (
+    "/api/products/?limit=100",
+    "/api/products/categories",
+    "/api/products/categories?counts=true",
+)
+
+
+class StartupTimer:
+    """Durations of the startup phases, in the order they ran."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.details: Dict[str, Any] = {}
+        self.completed_at: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def complete(self) -> str:
+        """Mark startup as done and return a one-line summary of the phases."""
+        self.completed_at = time.time()
+        phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        return f"Started in {self.total() * 1000:.0f} ms ({phases})"
+
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def stats(self) -> dict:
+        """Report the phase breakdown in milliseconds."""
+        return {
+            "total_ms": round(self.total() * 1000, 1),
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "details": self.details,
+            "completed_at": self.completed_at,
+        }
+
+    def metric_lines(self) -> List[str]:
+        """Render the phase durations as a Prometheus gauge."""
+        if not self.phases:
+            return []
+        return gauge_lines(
+            "app_startup_seconds", "Duration of each startup phase in seconds.", ("phase",),
+            {(name,): round(seconds, 6) for name, seconds in self.phases.items()}
+        )
+
+
+async def _get(app: Any, path: str) -> Tuple[int, bytes]:
+    """GET path from the ASGI app in-process; returns the status and (identity-encoded) body."""
+    url_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": url_path, "raw_path": url_path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"warmup"), (b"accept-encoding", b"br, gzip")],
+        "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    response = {"status": 0, "encoding": None}
+    chunks: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["encoding"] = dict(message.get("headers", [])).get(b"content-encoding")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    body = b"".join(chunks)
+    # The Accept-Encoding above warms the compressor; decode to read the body
+    if response["encoding"] == b"gzip":
+        body = gzip.decompress(body)
+    elif response["encoding"] == b"br":
+        body = brotli.decompress(body)
+    return response["status"], body
+
+
+async def warm_up(app: Any) -> Dict[str, int]:
+    """Send the hot catalog requests through app once; returns each path's status code."""
+    statuses: Dict[str, int] = {}
+    for path in WARMUP_PATHS:
+        status, body = await _get(app, path)
+        statuses[path] = status
+        if path == WARMUP_PATHS[0] and status == 200:
+            products = json.loads(body)
+            if products:
+                product_path = f"/api/products/{products[0]['id']}"
+                statuses[product_path] = (await _get(app, product_path))[0]
+    return statuses
+
+
+startup_timer = StartupTimer()
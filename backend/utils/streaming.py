@@ -0,0 +1,54 @@
+"""Helpers for streamed request and response bodies."""
+import tempfile
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, BinaryIO, Iterable
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Request bodies larger than this are spooled to a temporary file
+SPOOL_MAX_MEMORY = 1024 * 1024
+# Streamed exports yield a chunk once this much output has been buffered
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def export_value(value: Any) -> Any:
+    """Convert a column value to what CSV/NDJSON exports write."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def format_from_content_type(content_type: str, default: str = "csv") -> str:
+    """Map a request Content-Type to a transfer format (csv or ndjson)."""
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if "csv" in content_type:
+        return "csv"
+    return default
+
+
+async def spool_request_body(request: Request) -> BinaryIO:
+    """
+    Read the request body chunk by chunk into a spooled temporary file,
+    rewound and ready to parse, without holding a large upload in memory.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def attachment_response(chunks: Iterable[bytes], filename: str, fmt: str) -> StreamingResponse:
+    """Stream chunks as a downloadable CSV/NDJSON file."""
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,88 @@
+"""Bounded LRU cache of verified JWT payloads.
+
+Clients resend the same bearer token on every request, so the payload of a
+token that already passed signature verification is remembered, keyed by a
+digest of the token. Entries expire at the token's own ``exp`` claim, so a
+cached payload is never accepted after the token itself would be rejected.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+class TokenCache:
+    """Thread-safe LRU cache of verified token payloads."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Get the cached payload for a token, or None if absent or expired."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: dict) -> None:
+        """Remember a verified payload until the token's expiry."""
+        expires_at = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_verify(self, token: str, verify: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        """Return the cached payload, verifying and caching the token on a miss."""
+        payload = self.get(token)
+        if payload is None:
+            payload = verify(token)
+            if payload is not None:
+                self.put(token, payload)
+        return payload
+
+    def clear(self) -> None:
+        """Drop all cached payloads (e.g. after rotating SECRET_KEY)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Report size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+verified_token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE)